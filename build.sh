@@ -1 +1 @@
-python3 src/main.py "/bootdev-staticsitegenerator/"
\ No newline at end of file
+python3 src/main.py "/bootdev-staticsitegenerator/" --site-url "https://toddswift.github.io"
@@ -0,0 +1,6 @@
+shards=${1:-4}
+for i in $(seq 1 "$shards"); do
+    python3 src/main.py "/bootdev-staticsitegenerator/" --site-url "https://toddswift.github.io" --shard "$i/$shards" &
+done
+wait
+python3 src/shards.py docs $(seq -f ".shards/%g-of-$shards" 1 "$shards")
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+
+from copystatic import copy_files_recursive
+from output import write_if_changed
+from sourceindex import scan_tree
+
+
+ASSETS_MANIFEST_NAME = "assets.json"
+HASH_LENGTH = 8
+CHUNK_SIZE = 1 << 16
+# Files that browsers or crawlers request by name keep it.
+STABLE_SUFFIXES = (".html", ".htm")
+STABLE_NAMES = ("favicon.ico", "robots.txt")
+
+
+def is_fingerprinted(rel_path):
+    if rel_path.endswith(STABLE_SUFFIXES):
+        return False
+    return posixpath.basename(rel_path) not in STABLE_NAMES
+
+
+def fingerprinted_name(rel_path, digest):
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def copy_fingerprinted(
+    source_dir_path,
+    dest_dir_path,
+    manifest=None,
+    checksum=False,
+    link=False,
+    entries=None,
+):
+    if entries is None:
+        entries = scan_tree(source_dir_path)
+    stable = [entry for entry in entries if not is_fingerprinted(entry.rel_path)]
+    copied = copy_files_recursive(
+        source_dir_path, dest_dir_path, manifest, checksum, link, stable
+    )
+
+    assets = {}
+    created_dirs = set()
+    for entry in entries:
+        if not is_fingerprinted(entry.rel_path):
+            continue
+        plain_path = os.path.join(dest_dir_path, *entry.rel_path.split("/"))
+        hashed_rel_path = _previous_name(manifest, plain_path, entry, dest_dir_path)
+        if hashed_rel_path is None:
+            dest_dir = os.path.dirname(plain_path)
+            if dest_dir not in created_dirs:
+                os.makedirs(dest_dir, exist_ok=True)
+                created_dirs.add(dest_dir)
+            hashed_rel_path, written = copy_hashed(entry, dest_dir_path)
+            if written:
+                dest_path = os.path.join(dest_dir_path, *hashed_rel_path.split("/"))
+                print(f" * {entry.path} -> {dest_path}")
+                copied.append(dest_path)
+        assets["/" + entry.rel_path] = "/" + hashed_rel_path
+        if manifest is not None:
+            dest_path = os.path.join(dest_dir_path, *hashed_rel_path.split("/"))
+            manifest.record("static", dest_path, f"{entry.size}:{entry.mtime_ns}")
+            manifest.record(
+                "assets", plain_path, [hashed_rel_path, list(entry.signature())]
+            )
+
+    manifest_path = os.path.join(dest_dir_path, ASSETS_MANIFEST_NAME)
+    if manifest is not None:
+        manifest.record("generated", manifest_path, "")
+    if write_if_changed(manifest_path, [assets_json(assets)]):
+        copied.append(manifest_path)
+    return assets, copied
+
+
+def _previous_name(manifest, plain_path, entry, dest_dir_path):
+    if manifest is None:
+        return None
+    previous = manifest.previous_value("assets", plain_path)
+    if previous is None or previous[1] != list(entry.signature()):
+        return None
+    hashed_rel_path = previous[0]
+    dest_path = os.path.join(dest_dir_path, *hashed_rel_path.split("/"))
+    if not os.path.exists(dest_path):
+        return None
+    return hashed_rel_path
+
+
+def copy_hashed(entry, dest_dir_path):
+    # Hash while copying to a temporary file, so each asset is read once
+    # and only CHUNK_SIZE bytes of it are held in memory.
+    plain_path = os.path.join(dest_dir_path, *entry.rel_path.split("/"))
+    tmp_path = f"{plain_path}.tmp{os.getpid()}"
+    digest = hashlib.sha256()
+    try:
+        with open(entry.path, "rb") as src, open(tmp_path, "wb") as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+        hashed_rel_path = fingerprinted_name(entry.rel_path, digest.hexdigest())
+        dest_path = os.path.join(dest_dir_path, *hashed_rel_path.split("/"))
+        # The name covers the contents, so an existing file is already right.
+        if os.path.exists(dest_path):
+            return hashed_rel_path, False
+        shutil.copystat(entry.path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        return hashed_rel_path, True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def assets_json(assets):
+    names = {url[1:]: hashed_url[1:] for url, hashed_url in assets.items()}
+    return json.dumps(names, indent=1, sort_keys=True) + "\n"
+
+
+def assets_digest(assets):
+    if not assets:
+        return ""
+    return hashlib.sha256(assets_json(assets).encode()).hexdigest()[:16]
@@ -0,0 +1,325 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gencontent import find_pages, generate_pages_recursive
+from htmlescape import escape_attr, escape_text
+from inline_markdown import text_to_textnodes
+from markdown_blocks import (
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves and dwarves and men each received rings of their own"
+).split()
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet"></head>
+<body><article>{{ Content }}</article></body>
+</html>
+"""
+
+
+def random_sentence(rng, words, link_density):
+    parts = []
+    for i in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < link_density:
+            parts.append(f"[{word}](/blog/{word}-{i})")
+        elif roll < link_density * 1.5:
+            parts.append(f"![{word}](/images/{word}.png)")
+        elif roll < 0.05 + link_density * 1.5:
+            parts.append(f"**{word}**")
+        elif roll < 0.10 + link_density * 1.5:
+            parts.append(f"_{word}_")
+        elif roll < 0.12 + link_density * 1.5:
+            parts.append(f"`{word}`")
+        else:
+            parts.append(word)
+    return " ".join(parts)
+
+
+def random_page(rng, index, blocks, list_items, link_density):
+    lines = [f"# Page {index}", ""]
+    for i in range(blocks):
+        kind = i % 6
+        if kind == 0:
+            lines.append(f"## Section {i}")
+        elif kind == 1:
+            lines.extend(
+                f"- {random_sentence(rng, 8, link_density)}" for _ in range(list_items)
+            )
+        elif kind == 2:
+            lines.extend(
+                f"{n}. {random_sentence(rng, 8, link_density)}"
+                for n in range(1, list_items + 1)
+            )
+        elif kind == 3:
+            lines.extend(
+                f"> {random_sentence(rng, 12, link_density)}" for _ in range(3)
+            )
+        elif kind == 4:
+            lines.extend(["```", "def main():", "    print('hello')", "```"])
+        else:
+            lines.extend(random_sentence(rng, 20, link_density) for _ in range(4))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_corpus(
+    root, pages=100, blocks=30, list_items=5, link_density=0.05, seed=0
+):
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    for index in range(pages):
+        page_dir = os.path.join(content_dir, f"section-{index % 10}", f"page-{index}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(random_page(rng, index, blocks, list_items, link_density))
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w") as f:
+        f.write(TEMPLATE)
+    return content_dir, template_path
+
+
+def list_heavy_markdown(rng, lists=100, items=50):
+    blocks = []
+    for i in range(lists):
+        lines = []
+        for n in range(1, items + 1):
+            marker = f"{n}." if i % 2 else "-"
+            lines.append(f"{marker} {random_sentence(rng, 6, 0.05)}")
+        blocks.append("\n".join(lines))
+    return "# Lists\n\n" + "\n\n".join(blocks)
+
+
+def quote_heavy_markdown(rng, quotes=500, lines=10):
+    blocks = [
+        "\n".join(f"> {random_sentence(rng, 10, 0.02)}" for _ in range(lines))
+        for _ in range(quotes)
+    ]
+    return "# Quotes\n\n" + "\n\n".join(blocks)
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_benchmarks(root, repeat=3, jobs=1):
+    content_dir = os.path.join(root, "content")
+    template_path = os.path.join(root, "template.html")
+    dest_dir = os.path.join(root, "docs")
+    markdowns = []
+    for from_path, _ in find_pages(content_dir, dest_dir):
+        with open(from_path) as f:
+            markdowns.append(f.read())
+    blocks = [block for md in markdowns for block in markdown_to_blocks(md)]
+    nodes = [markdown_to_html_node(md) for md in markdowns]
+
+    def inline_parse():
+        for block in blocks:
+            text_to_textnodes(block)
+
+    def build_tree():
+        for md in markdowns:
+            markdown_to_html_node(md)
+
+    def serialize():
+        for node in nodes:
+            node.to_html()
+
+    text_nodes = [node for block in blocks for node in text_to_textnodes(block)]
+
+    def escape():
+        for node in text_nodes:
+            escape_text(node.text)
+            if node.url is not None:
+                escape_attr(node.url)
+
+    rng = random.Random(0)
+    list_heavy = list_heavy_markdown(rng)
+    quote_heavy = quote_heavy_markdown(rng)
+    shaped_blocks = markdown_to_blocks(list_heavy) + markdown_to_blocks(quote_heavy)
+
+    def block_typing():
+        for block in shaped_blocks:
+            block_to_block_type(block)
+
+    def full_build():
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(
+                content_dir, template_path, dest_dir, "/", jobs=jobs
+            )
+
+    stages = {
+        "text_to_textnodes": inline_parse,
+        "markdown_to_html_node": build_tree,
+        "to_html": serialize,
+        "html_escape": escape,
+        "generate_pages_recursive": full_build,
+        "block_to_block_type": block_typing,
+        "list_heavy_page": lambda: markdown_to_html_node(list_heavy),
+        "quote_heavy_page": lambda: markdown_to_html_node(quote_heavy),
+    }
+    total_bytes = sum(len(md.encode()) for md in markdowns)
+    results = {}
+    for name, func in stages.items():
+        seconds = best_time(func, repeat)
+        results[name] = {
+            "seconds": seconds,
+            "pages_per_second": len(markdowns) / seconds if seconds else None,
+            "mb_per_second": total_bytes / seconds / 1e6 if seconds else None,
+        }
+    return {
+        "python": platform.python_version(),
+        "pages": len(markdowns),
+        "bytes": total_bytes,
+        "repeat": repeat,
+        "stages": results,
+        "memory": measure_node_memory(markdowns),
+    }
+
+
+def count_nodes(node):
+    count = 1
+    for child in node.children or ():
+        count += count_nodes(child)
+    return count
+
+
+def measure_node_memory(markdowns):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        nodes = [markdown_to_html_node(md) for md in markdowns]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    node_count = sum(count_nodes(node) for node in nodes)
+    return {
+        "nodes": node_count,
+        "bytes": after - before,
+        "bytes_per_node": (after - before) / node_count if node_count else None,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    rows = []
+    for name, stage in current["stages"].items():
+        if name not in baseline["stages"]:
+            continue
+        before = baseline["stages"][name]["seconds"]
+        after = stage["seconds"]
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the site generator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="generate a corpus and time each stage")
+    run.add_argument("--pages", type=int, default=200)
+    run.add_argument("--blocks", type=int, default=30, help="blocks per page")
+    run.add_argument("--list-items", type=int, default=5, help="items per list")
+    run.add_argument("--link-density", type=float, default=0.05)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("-j", "--jobs", type=int, default=1)
+    run.add_argument("--corpus", help="reuse or keep the corpus in this directory")
+    run.add_argument("--out", help="write JSON results to this file")
+
+    compare = commands.add_parser("compare", help="compare two JSON result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10)
+    return parser.parse_args(argv)
+
+
+def run_command(args):
+    root = args.corpus or tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        if not os.path.exists(os.path.join(root, "content")):
+            generate_corpus(
+                root,
+                args.pages,
+                args.blocks,
+                args.list_items,
+                args.link_density,
+                args.seed,
+            )
+        results = run_benchmarks(root, args.repeat, args.jobs)
+    finally:
+        if args.corpus is None:
+            shutil.rmtree(root, ignore_errors=True)
+    results["params"] = {
+        "pages": args.pages,
+        "blocks": args.blocks,
+        "list_items": args.list_items,
+        "link_density": args.link_density,
+        "seed": args.seed,
+        "jobs": args.jobs,
+    }
+    for name, stage in results["stages"].items():
+        print(f"{name:<28} {stage['seconds'] * 1000:10.1f}ms")
+    memory = results["memory"]
+    print(f"{'node memory':<28} {memory['bytes_per_node']:10.1f}B/node")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+def compare_command(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressed = False
+    for name, before, after, change, is_regression in compare_results(
+        baseline, current, args.threshold
+    ):
+        flag = " REGRESSION" if is_regression else ""
+        print(
+            f"{name:<28} {before * 1000:10.1f}ms -> {after * 1000:10.1f}ms "
+            f"{change:+7.1%}{flag}"
+        )
+        regressed = regressed or is_regression
+    return 1 if regressed else 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "run":
+        return run_command(args)
+    return compare_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Pending writes are flushed mid-page past these, so a long page streams.
+FLUSH_ROWS = 256
+FLUSH_BYTES = 1024 * 1024
+
+
+class BlockCache:
+    def __init__(self, path, version, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pending = []
+        self._pending_bytes = 0
+        self._used = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pending"] = []
+        state["_pending_bytes"] = 0
+        state["_used"] = []
+        return state
+
+    def connection(self):
+        if self._connection is None:
+            dir_path = os.path.dirname(self.path)
+            if dir_path != "":
+                os.makedirs(dir_path, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks ("
+                "key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+                "size INTEGER NOT NULL, used INTEGER NOT NULL, "
+                "links TEXT NOT NULL DEFAULT '')"
+            )
+            columns = [
+                row[1] for row in self._connection.execute("PRAGMA table_info(blocks)")
+            ]
+            if "links" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE blocks ADD COLUMN links TEXT NOT NULL DEFAULT ''"
+                )
+        return self._connection
+
+    def key(self, block):
+        return hashlib.sha256(f"{self.version}\0{block}".encode()).hexdigest()
+
+    def get(self, block):
+        entry = self.get_entry(block)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, block):
+        key = self.key(block)
+        row = self.connection().execute(
+            "SELECT html, links FROM blocks WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.append(key)
+        if len(self._used) >= FLUSH_ROWS:
+            self.flush()
+        html, links = row
+        return html, links.split("\n") if links else []
+
+    def put(self, block, html, links=()):
+        size = len(html.encode())
+        self._pending.append((self.key(block), html, size, "\n".join(links)))
+        self._pending_bytes += size
+        if len(self._pending) >= FLUSH_ROWS or self._pending_bytes >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if not self._pending and not self._used:
+            return
+        now = time.time_ns()
+        with self.connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, used, links) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, html, size, now, links)
+                    for key, html, size, links in self._pending
+                ],
+            )
+            connection.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?",
+                [(now, key) for key in self._used],
+            )
+        self._pending = []
+        self._pending_bytes = 0
+        self._used = []
+
+    def prune(self):
+        self.flush()
+        connection = self.connection()
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blocks"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = []
+        rows = connection.execute("SELECT key, size FROM blocks ORDER BY used")
+        for key, size in rows.fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        with connection:
+            connection.executemany("DELETE FROM blocks WHERE key = ?", evicted)
+        return len(evicted)
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
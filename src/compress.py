@@ -0,0 +1,73 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+DEFAULT_MIN_SIZE = 1024
+CHUNK_SIZE = 1 << 16
+
+
+def compressed_paths(path, use_brotli=False):
+    paths = [path + ".gz"]
+    if use_brotli:
+        paths.append(path + ".br")
+    return paths
+
+
+def compress_outputs(
+    outputs,
+    changed,
+    manifest=None,
+    min_size=DEFAULT_MIN_SIZE,
+    use_brotli=False,
+    jobs=None,
+):
+    if use_brotli and brotli is None:
+        raise RuntimeError("brotli compression needs the 'brotli' package")
+    changed = {os.path.normpath(path) for path in changed}
+    pending = []
+    for path in sorted(outputs):
+        path = os.path.normpath(path)
+        if not path.endswith(COMPRESSIBLE_SUFFIXES):
+            continue
+        if os.path.getsize(path) < min_size:
+            continue
+        for compressed_path in compressed_paths(path, use_brotli):
+            if manifest is not None:
+                manifest.record("compressed", compressed_path, "")
+            if path in changed or not os.path.exists(compressed_path):
+                pending.append((path, compressed_path))
+
+    with ThreadPoolExecutor(jobs) as executor:
+        list(executor.map(lambda job: compress_file(*job), pending))
+    return [compressed_path for _, compressed_path in pending]
+
+
+def compress_file(path, compressed_path):
+    tmp_path = f"{compressed_path}.tmp{os.getpid()}"
+    try:
+        with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            if compressed_path.endswith(".br"):
+                _brotli_stream(src, dst)
+            else:
+                # mtime=0 and no file name keep the output reproducible.
+                with gzip.GzipFile("", "wb", 9, dst, mtime=0) as gz:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        gz.write(chunk)
+        os.replace(tmp_path, compressed_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _brotli_stream(src, dst):
+    compressor = brotli.Compressor(quality=11)
+    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+        dst.write(compressor.process(chunk))
+    dst.write(compressor.finish())
@@ -1,16 +1,103 @@
 import os
 import shutil
 
+from manifest import hash_file
+from sourceindex import scan_tree
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
+
+FICLONE = 0x40049409
+COPY_CHUNK_SIZE = 1 << 24
+
+
+def copy_files_recursive(
+    source_dir_path,
+    dest_dir_path,
+    manifest=None,
+    checksum=False,
+    link=False,
+    entries=None,
+):
+    if entries is None:
+        entries = scan_tree(source_dir_path)
+    os.makedirs(dest_dir_path, exist_ok=True)
+
+    created_dirs = set()
+    copied = []
+    for entry in entries:
+        from_path = entry.path
+        dest_path = os.path.join(dest_dir_path, *entry.rel_path.split("/"))
+        if manifest is not None:
+            manifest.record("static", dest_path, f"{entry.size}:{entry.mtime_ns}")
+            if is_unchanged(from_path, entry, dest_path, checksum):
+                continue
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir not in created_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            created_dirs.add(dest_dir)
         print(f" * {from_path} -> {dest_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
-        else:
-            copy_files_recursive(from_path, dest_path)
\ No newline at end of file
+        copy_file(from_path, dest_path, link)
+        copied.append(dest_path)
+    return copied
+
+
+def is_unchanged(from_path, entry, dest_path, checksum=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if dest_stat.st_size != entry.size:
+        return False
+    if dest_stat.st_mtime_ns == entry.mtime_ns:
+        return True
+    if not checksum or hash_file(from_path) != hash_file(dest_path):
+        return False
+    os.utime(dest_path, ns=(dest_stat.st_atime_ns, entry.mtime_ns))
+    return True
+
+
+def copy_file(from_path, dest_path, link=False):
+    tmp_path = f"{dest_path}.tmp{os.getpid()}"
+    try:
+        if link:
+            try:
+                os.link(from_path, tmp_path)
+                os.replace(tmp_path, dest_path)
+                return
+            except OSError:
+                pass
+        with open(from_path, "rb") as src, open(tmp_path, "wb") as dst:
+            if not _clone_file(src, dst):
+                _copy_file_contents(src, dst)
+        shutil.copystat(from_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _clone_file(src, dst):
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _copy_file_contents(src, dst):
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK_SIZE):
+                pass
+            return
+        except OSError:
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
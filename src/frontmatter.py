@@ -0,0 +1,53 @@
+FRONT_MATTER_SEPARATORS = {"---": ":", "+++": "="}
+
+
+def read_front_matter(f):
+    start = f.tell()
+    first = f.readline()
+    fence = first.rstrip("\n")
+    separator = FRONT_MATTER_SEPARATORS.get(fence)
+    if separator is None:
+        f.seek(start)
+        return {}
+    metadata = {}
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError(f"front matter not closed, expected {fence}")
+        line = line.rstrip("\n")
+        if line == fence:
+            return metadata
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        key, found, value = stripped.partition(separator)
+        key = key.strip()
+        if not found or not key:
+            raise ValueError(f"invalid front matter line: {line!r}")
+        metadata[key] = parse_value(value.strip())
+
+
+def parse_value(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        items = value[1:-1].split(",")
+        return [parse_value(item.strip()) for item in items if item.strip()]
+    if value in ("true", "false"):
+        return value == "true"
+    # isdigit() alone accepts digits such as "²" that int() rejects.
+    if value.isascii() and value.isdigit():
+        return int(value)
+    return value
+
+
+def is_published(metadata):
+    return not metadata.get("draft", False) and metadata.get("published", True)
+
+
+def format_value(value):
+    if isinstance(value, list):
+        return ", ".join(format_value(item) for item in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
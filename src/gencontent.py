@@ -1,48 +1,309 @@
+import hashlib
 import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from markdown_blocks import markdown_to_html_node
 
+import profiling
+from assets import assets_digest
+from frontmatter import format_value, read_front_matter
+from htmlescape import escape_attr
+from links import LinkIndex
+from manifest import hash_file
+from markdown_blocks import iter_markdown_html
+from output import write_if_changed
+from shards import in_shard
+from siteindex import build_site_index, extract_title_from_lines
+from sourceindex import scan_tree
+from template import load_template, resolve_template_path
+from urls import UrlResolver
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
-        else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
 
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath,
+    manifest=None,
+    jobs=1,
+    cache=None,
+    pipeline=None,
+    entries=None,
+    links=None,
+    shard=None,
+    site_url="",
+    drafts=False,
+    assets=None,
+):
+    pages = find_pages(dir_path_content, dest_dir_path, entries)
+    site = build_site_index(pages, dest_dir_path, drafts)
+    graph = site.dependency_graph(template_path, basepath)
+    dependency_digests = {}
+    # Every template links the stylesheet, so any asset change re-renders all.
+    fingerprints = assets_digest(assets)
+    pending = []
+    for from_path, dest_path in pages:
+        if site.get(dest_path) is None:
+            continue
+        if shard is not None and not in_shard(
+            _rel_path(from_path, dir_path_content), shard
+        ):
+            continue
+        if manifest is not None:
+            dependencies = graph[os.path.normpath(dest_path)]
+            digest = site.page_digest(dest_path, hash_file(from_path))
+            digest += ":" + _dependencies_digest(dependencies, dependency_digests)
+            if fingerprints:
+                digest += ":" + fingerprints
+            manifest.record("pages", dest_path, digest)
+            manifest.record("depends", dest_path, list(dependencies))
+            if manifest.is_current("pages", dest_path, digest):
+                if links is None:
+                    continue
+                targets = manifest.previous_value("links", dest_path)
+                if targets is not None:
+                    links.add(dest_path, targets)
+                    continue
+        pending.append((from_path, dest_path))
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
+    if pipeline is not None:
+        changed = pipeline.run(
+            pending, template_path, basepath, cache, links, site, assets
+        )
+    else:
+        changed = _render_pages(
+            pending, template_path, basepath, jobs, cache, links, site, assets
+        )
+    changed.extend(
+        generate_site_pages(
+            site, template_path, basepath, manifest, links, shard, site_url, assets
+        )
+    )
+    return changed
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+def _dependencies_digest(dependencies, digests):
+    combined = hashlib.sha256()
+    for path in dependencies:
+        if path not in digests:
+            try:
+                digests[path] = hash_file(path)
+            except OSError:
+                digests[path] = "missing"
+        combined.update(f"{path}\0{digests[path]}\0".encode())
+    return combined.hexdigest()[:16]
 
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', 'href="' + basepath)
-    template = template.replace('src="/', 'src="' + basepath)
 
+def _render_pages(
+    pending, template_path, basepath, jobs, cache, links, site, assets=None
+):
+    changed = []
+    profiler = profiling.active
+    if jobs <= 1 or len(pending) <= 1:
+        for from_path, dest_path in pending:
+            print(f" * {from_path} {template_path} -> {dest_path}")
+            if profiler is not None:
+                profiler.begin_page(from_path)
+            if generate_page(
+                from_path,
+                template_path,
+                dest_path,
+                basepath,
+                cache,
+                links,
+                site.get(dest_path),
+                assets,
+            ):
+                changed.append(dest_path)
+            if profiler is not None:
+                profiler.end_page()
+        return changed
+
+    jobs_args = [
+        (
+            from_path,
+            template_path,
+            dest_path,
+            basepath,
+            cache,
+            profiler is not None,
+            links is not None,
+            site.get(dest_path),
+            assets,
+        )
+        for from_path, dest_path in pending
+    ]
+    chunksize = max(1, len(jobs_args) // (jobs * 4))
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_generate_page_job, jobs_args, chunksize=chunksize)
+        for (from_path, dest_path), result in zip(pending, results):
+            error, page, written, page_links = result
+            print(f" * {from_path} {template_path} -> {dest_path}")
+            if page is not None:
+                profiler.add_page(page)
+            if page_links is not None:
+                links.update(page_links)
+            if error is not None:
+                print(f" ! {from_path}: {error}")
+                failures.append(from_path)
+            if written:
+                changed.append(dest_path)
+    if failures:
+        raise RuntimeError(f"{len(failures)} page(s) failed to build")
+    return changed
+
+
+def generate_site_pages(
+    site,
+    template_path,
+    basepath,
+    manifest=None,
+    links=None,
+    shard=None,
+    site_url="",
+    assets=None,
+):
+    changed = []
+    for dest_path, chunks, targets in site.generated_pages(
+        template_path, basepath, site_url, assets
+    ):
+        rel_path = _rel_path(dest_path, site.dest_dir_path)
+        if shard is not None and not in_shard(rel_path, shard):
+            continue
+        if manifest is not None:
+            manifest.record("generated", dest_path, "")
+        if links is not None:
+            links.add(dest_path, targets)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        if write_if_changed(dest_path, chunks):
+            print(f" * generated {dest_path}")
+            changed.append(dest_path)
+    return changed
+
+
+def find_pages(dir_path_content, dest_dir_path, entries=None):
+    if entries is None:
+        entries = scan_tree(dir_path_content)
+    pages = []
+    for entry in entries:
+        dest_path = os.path.join(dest_dir_path, *entry.rel_path.split("/"))
+        pages.append((entry.path, Path(dest_path).with_suffix(".html")))
+    return pages
+
+
+def _generate_page_job(args):
+    (
+        from_path,
+        template_path,
+        dest_path,
+        basepath,
+        cache,
+        profile,
+        collect,
+        meta,
+        assets,
+    ) = args
+    if profile and (profiling.active is None or profiling.active.pid != os.getpid()):
+        profiling.active = profiling.Profiler()
+    if profile:
+        profiling.active.begin_page(from_path)
+    error = None
+    written = False
+    links = LinkIndex() if collect else None
+    try:
+        written = generate_page(
+            from_path, template_path, dest_path, basepath, cache, links, meta, assets
+        )
+    except Exception as e:
+        error = "".join(traceback.format_exception_only(type(e), e)).strip()
+    page = profiling.active.end_page() if profile else None
+    return error, page, written, links
+
+
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    basepath,
+    cache=None,
+    links=None,
+    meta=None,
+    assets=None,
+):
     dest_dir_path = os.path.dirname(dest_path)
     if dest_dir_path != "":
         os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+
+    with open(from_path, "r") as from_file:
+        with profiling.stage("read"):
+            metadata = read_front_matter(from_file)
+            if meta is not None and meta.title is not None:
+                title = meta.title
+            else:
+                title = page_title(from_file, metadata)
+
+        resolver = UrlResolver(basepath, assets)
+        chunks = render_page_chunks(
+            from_file,
+            title,
+            template_path,
+            basepath,
+            cache,
+            resolver,
+            meta,
+            metadata,
+        )
+        written = write_if_changed(dest_path, chunks)
+
+    if cache is not None:
+        cache.flush()
+    if links is not None:
+        links.add(dest_path, resolver.links)
+    return written
+
+
+def render_page_chunks(
+    lines,
+    title,
+    template_path,
+    basepath,
+    cache=None,
+    resolver=None,
+    meta=None,
+    metadata=None,
+):
+    if resolver is None:
+        resolver = UrlResolver(basepath)
+    with profiling.stage("template"):
+        name = None if metadata is None else metadata.get("template")
+        template = load_template(
+            resolve_template_path(template_path, name), basepath, resolver.assets
+        )
+        content = iter_markdown_html(lines, cache, resolver)
+        values = {}
+        if metadata:
+            for key, value in metadata.items():
+                values[key] = escape_attr(format_value(value))
+        values["Title"] = escape_attr(title)
+        values["Content"] = content
+        values["Nav"] = "" if meta is None else meta.nav_html(resolver)
+    return profiling.iter_stage("serialize", template.iter_render(values))
 
 
 def extract_title(md):
-    lines = md.split("\n")
-    for line in lines:
-        if line.startswith("# "):
-            return line[2:]
-    raise ValueError("no title found")
+    return extract_title_from_lines(md.split("\n"))
+
+
+def page_title(f, metadata):
+    title = metadata.get("title")
+    if title is not None:
+        return str(title)
+    body_start = f.tell()
+    title = extract_title_from_lines(iter(f.readline, ""))
+    f.seek(body_start)
+    return title
+
+
+def _rel_path(path, root):
+    return os.path.relpath(path, root).replace(os.sep, "/")
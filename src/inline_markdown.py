@@ -3,13 +3,57 @@ import re
 from textnode import TextNode, TextType
 
 
+INLINE_TOKEN_RE = re.compile(r"\*\*|[_`]|!?\[")
+IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+DELIMITER_CHARS_RE = re.compile(r"\*\*|[_`]")
+
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    pos = 0
+    text_start = 0
+    length = len(text)
+    while pos < length:
+        match = INLINE_TOKEN_RE.search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+
+        if token in DELIMITER_TYPES:
+            if text_start < start:
+                nodes.append(TextNode(text[text_start:start], TextType.TEXT))
+            content_start = start + len(token)
+            end = text.find(token, content_start)
+            if end == -1:
+                raise ValueError("invalid markdown, formatted section not closed")
+            if end > content_start:
+                nodes.append(TextNode(text[content_start:end], DELIMITER_TYPES[token]))
+            pos = text_start = end + len(token)
+            continue
+
+        if token == "![":
+            link_match = IMAGE_RE.match(text, start)
+            text_type = TextType.IMAGE
+        else:
+            link_match = LINK_RE.match(text, start)
+            text_type = TextType.LINK
+        if link_match is None or DELIMITER_CHARS_RE.search(link_match.group()):
+            pos = start + 1
+            continue
+        if text_start < start:
+            nodes.append(TextNode(text[text_start:start], TextType.TEXT))
+        nodes.append(TextNode(link_match.group(1), text_type, link_match.group(2)))
+        pos = text_start = link_match.end()
+
+    if text_start < length:
+        nodes.append(TextNode(text[text_start:], TextType.TEXT))
     return nodes
 
 
@@ -89,12 +133,8 @@ def split_nodes_link(old_nodes):
 
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_RE.findall(text)
@@ -0,0 +1,43 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+
+class LinkIndex:
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, dest_path, targets):
+        self.pages[os.path.normpath(dest_path)] = list(targets)
+
+    def update(self, other):
+        self.pages.update(other.pages)
+
+    def check(self, dest_dir_path, outputs, assets=None):
+        site_files = {site_path(path, dest_dir_path) for path in outputs}
+        if assets is None:
+            assets = {}
+        broken = []
+        for dest_path in sorted(self.pages):
+            page_url = "/" + site_path(dest_path, dest_dir_path)
+            for target in self.pages[dest_path]:
+                path = target_path(assets.get(target, target), page_url)
+                if path is None or path in site_files:
+                    continue
+                if posixpath.join(path, "index.html") in site_files:
+                    continue
+                broken.append((dest_path, target))
+        return broken
+
+
+def site_path(path, dest_dir_path):
+    return os.path.relpath(path, dest_dir_path).replace(os.sep, "/")
+
+
+def target_path(target, page_url):
+    parts = urlsplit(target)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = posixpath.join(posixpath.dirname(page_url), unquote(parts.path))
+    path = posixpath.normpath(path).lstrip("/")
+    return "" if path == "." else path
@@ -1,32 +1,329 @@
+import argparse
 import os
-import shutil
 import sys
 
+import profiling
+from assets import copy_fingerprinted
+from blockcache import BlockCache
+from compress import DEFAULT_MIN_SIZE, brotli, compress_outputs
 from copystatic import copy_files_recursive
 from gencontent import generate_pages_recursive
+from links import LinkIndex
+from manifest import BuildManifest, hash_file
+from markdown_blocks import cache_version
+from output import check_output_dir, write_changed_files
+from pipeline import PagePipeline
+from shards import SHARD_MANIFEST_NAME, in_shard, parse_shard, shard_output_dir
+from sourceindex import scan_tree
+from watch import SiteWatcher
 
 
 dir_path_static = "./static"
 dir_path_public = "./docs"
 dir_path_content = "./content"
 template_path = "./template.html"
+manifest_path = "./.build_manifest.json"
+cache_path = "./.cache/blocks.sqlite3"
 default_basepath = "/"
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument(
+        "--output",
+        metavar="DIR",
+        help="directory to write the site to (default: ./docs, or ./.shards/i-of-N)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="build only the i-th of N stable-hash partitions of the pages "
+        "and static files, for merging with shards.py",
+    )
+    parser.add_argument(
+        "--site-url",
+        default="",
+        help="absolute URL of the site, used for links in the blog feed",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also build pages marked draft or unpublished in their front matter",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild outputs whose sources changed since the last build",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static file contents when size matches but mtime differs",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hardlink static files into the output instead of copying them",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files under content-hashed names, write assets.json "
+        "and point links at the hashed names",
+    )
+    parser.add_argument(
+        "--changed-files",
+        metavar="PATH",
+        help="write the outputs written (M) and removed (D) by this build to PATH",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write a .gz sibling next to each compressible output",
+    )
+    parser.add_argument(
+        "--brotli",
+        action="store_true",
+        help="also write .br siblings (implies --gzip, needs the brotli package)",
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        help="skip compressing outputs smaller than this many bytes",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used to render pages (0 uses every CPU)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap source reads and output writes with rendering using threads",
+    )
+    parser.add_argument(
+        "--read-workers",
+        type=int,
+        default=4,
+        help="threads prefetching markdown in --pipeline mode",
+    )
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=4,
+        help="threads writing HTML in --pipeline mode",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=16,
+        help="pages buffered between pipeline stages in --pipeline mode",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="render every block from scratch instead of using the block cache",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="maximum size of the block cache in megabytes",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report links and images that point at missing pages or files",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each build stage per page and print a summary",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="with --profile, also write a Chrome trace-event JSON file",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild affected outputs when sources change",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.25,
+        help="seconds between source polls in watch mode",
+    )
+    args = parser.parse_args()
+    if args.pipeline and args.jobs != 1:
+        parser.error("--pipeline cannot be combined with --jobs")
+    if args.brotli and brotli is None:
+        parser.error("--brotli needs the brotli package")
+    if args.shard and (args.check_links or args.watch):
+        parser.error("--shard cannot be combined with --check-links or --watch")
+    if (args.gzip or args.brotli) and args.watch:
+        # The watcher rewrites outputs without refreshing their siblings.
+        parser.error("--gzip and --brotli cannot be combined with --watch")
+    if args.fingerprint and (args.shard or args.watch):
+        parser.error("--fingerprint cannot be combined with --shard or --watch")
+    if args.output:
+        try:
+            check_output_dir(
+                args.output, (dir_path_content, dir_path_static, template_path)
+            )
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
 def main():
-    basepath = default_basepath
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    args = parse_args()
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    dir_path_output = args.output or dir_path_public
+    build_manifest_path = manifest_path
+    if args.shard:
+        dir_path_output = args.output or shard_output_dir(args.shard)
+        build_manifest_path = os.path.join(dir_path_output, SHARD_MANIFEST_NAME)
+
+    if args.profile:
+        profiling.active = profiling.Profiler()
+
+    cache = None
+    if not args.no_cache:
+        version = cache_version(basepath, args.fingerprint)
+        cache = BlockCache(cache_path, version, args.cache_size * 1024 * 1024)
+
+    manifest = BuildManifest(build_manifest_path, hash_file(template_path), basepath)
+    manifest.output = os.path.normpath(dir_path_output)
+    if args.shard:
+        manifest.shard = args.shard
+    manifest.load(reuse=args.incremental)
+
+    pipeline = None
+    if args.pipeline:
+        pipeline = PagePipeline(args.read_workers, args.write_workers, args.queue_depth)
+
+    links = LinkIndex() if args.check_links else None
 
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+    static_entries = scan_tree(dir_path_static)
+    content_entries = scan_tree(dir_path_content)
+    if args.shard:
+        static_entries = [e for e in static_entries if in_shard(e.rel_path, args.shard)]
 
     print("Copying static files to public directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    assets = None
+    if args.fingerprint:
+        assets, copied = copy_fingerprinted(
+            dir_path_static,
+            dir_path_output,
+            manifest,
+            checksum=args.checksum,
+            link=args.link_static,
+            entries=static_entries,
+        )
+    else:
+        copied = copy_files_recursive(
+            dir_path_static,
+            dir_path_output,
+            manifest,
+            checksum=args.checksum,
+            link=args.link_static,
+            entries=static_entries,
+        )
 
     print("Generating content...")
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public, basepath)
+    generated = generate_pages_recursive(
+        dir_path_content,
+        template_path,
+        dir_path_output,
+        basepath,
+        manifest=manifest,
+        jobs=jobs,
+        cache=cache,
+        pipeline=pipeline,
+        entries=content_entries,
+        links=links,
+        shard=args.shard,
+        site_url=args.site_url,
+        drafts=args.drafts,
+        assets=assets,
+    )
+
+    compressed = []
+    if args.gzip or args.brotli:
+        print("Compressing outputs...")
+        compressed = compress_outputs(
+            manifest.outputs(),
+            copied + generated,
+            manifest,
+            min_size=args.compress_min_size,
+            use_brotli=args.brotli,
+        )
+        for compressed_path in compressed:
+            print(f" * {compressed_path}")
+
+    removed = manifest.prune()
+    for removed_path in removed:
+        print(f" * removed {removed_path}")
+    if links is not None:
+        for dest_path, targets in links.pages.items():
+            manifest.record("links", dest_path, targets)
+    manifest.save()
+    if args.changed_files:
+        write_changed_files(
+            args.changed_files,
+            copied + generated + compressed,
+            removed,
+            dir_path_output,
+        )
+    if cache is not None:
+        cache.prune()
+
+    broken = []
+    if links is not None:
+        print("Checking links...")
+        broken = links.check(dir_path_output, manifest.outputs(), assets)
+        for dest_path, target in broken:
+            print(f" ! {dest_path}: broken link {target}")
+        print(f"Found {len(broken)} broken link(s)")
+
+    if profiling.active is not None:
+        print(profiling.active.summary())
+        if args.trace:
+            profiling.active.write_trace(args.trace)
+            print(f"Wrote trace to {args.trace}")
+        profiling.active = None
+
+    if args.watch:
+        watcher = SiteWatcher(
+            dir_path_content,
+            dir_path_static,
+            template_path,
+            dir_path_output,
+            basepath,
+            args.watch_interval,
+            cache,
+            args.site_url,
+            args.drafts,
+        )
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+
+    if cache is not None:
+        cache.close()
+    if broken:
+        sys.exit(1)
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+
+MANIFEST_VERSION = 1
+# Sections holding per-output data rather than outputs of their own.
+DATA_SECTIONS = ("links", "depends", "assets")
+CHUNK_SIZE = 1 << 16
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path, template_digest, basepath):
+        self.path = path
+        self.template_digest = template_digest
+        self.basepath = basepath
+        self.previous = {}
+        self.current = {}
+        self.pages_valid = False
+        self.reuse = True
+        self.shard = None
+        self.output = None
+
+    def load(self, reuse=True):
+        # Without reuse the previous outputs are only known for pruning.
+        self.reuse = reuse
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            return
+        # A manifest written for another output directory describes none of
+        # the files in this one; pruning by it would delete them.
+        if self.output is not None and data.get("output") != self.output:
+            return
+        for section, entries in data.items():
+            if isinstance(entries, dict):
+                self.previous[section] = entries
+        # Page digests cover their own templates; only the basepath
+        # invalidates every page at once.
+        self.pages_valid = data.get("basepath") == self.basepath
+
+    def is_current(self, section, dest_path, digest):
+        if not self.reuse:
+            return False
+        if section == "pages" and not self.pages_valid:
+            return False
+        key = os.path.normpath(dest_path)
+        previous = self.previous.get(section, {})
+        return previous.get(key) == digest and os.path.exists(key)
+
+    def record(self, section, dest_path, digest):
+        self.current.setdefault(section, {})[os.path.normpath(dest_path)] = digest
+
+    def previous_value(self, section, dest_path):
+        if not self.reuse:
+            return None
+        return self.previous.get(section, {}).get(os.path.normpath(dest_path))
+
+    def outputs(self):
+        return {
+            path
+            for section, entries in self.current.items()
+            if section not in DATA_SECTIONS
+            for path in entries
+        }
+
+    def prune(self):
+        # Only files a previous build recorded are removed, never anything
+        # else that happens to live in the output directory.
+        outputs = self.outputs()
+        removed = []
+        for section, entries in self.previous.items():
+            if section in DATA_SECTIONS:
+                continue
+            for dest_path in entries:
+                if dest_path in outputs:
+                    continue
+                if os.path.isfile(dest_path):
+                    os.remove(dest_path)
+                    removed.append(dest_path)
+                    self._remove_empty_dirs(os.path.dirname(dest_path))
+        return sorted(removed)
+
+    def _remove_empty_dirs(self, dir_path):
+        if self.output is None:
+            return
+        while dir_path != self.output and dir_path.startswith(self.output + os.sep):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                return
+            dir_path = os.path.dirname(dir_path)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "template": self.template_digest,
+            "basepath": self.basepath,
+        }
+        if self.shard is not None:
+            data["shard"] = list(self.shard)
+        if self.output is not None:
+            data["output"] = self.output
+        data.update(self.current)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,8 +1,24 @@
+import io
 from enum import Enum
 
-from htmlnode import ParentNode
+import profiling
+from htmlnode import LeafNode, ParentNode
 from inline_markdown import text_to_textnodes
 from textnode import text_node_to_html_node, TextNode, TextType
+from urls import UrlResolver
+
+
+PARSER_VERSION = 4
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+HEADING_PREFIXES = tuple(f"{'#' * level} " for level in range(1, 7))
+
+
+def cache_version(basepath, fingerprint=False):
+    # Cached block HTML has links resolved against the basepath, and against
+    # the asset map when fingerprinting; blocks cached without a map would
+    # otherwise be served after it is turned on, and the reverse.
+    version = f"{PARSER_VERSION}:{basepath}"
+    return f"{version}:fingerprint" if fingerprint else version
 
 
 class BlockType(Enum):
@@ -15,97 +31,166 @@ class BlockType(Enum):
 
 
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
+    return list(iter_blocks(io.StringIO(markdown)))
+
+
+def iter_blocks(lines):
+    block_lines = []
+    in_fence = False
+    for line in lines:
+        if in_fence:
+            block_lines.append(line)
+            if line.rstrip().endswith("```"):
+                in_fence = False
+            continue
+        if line == "\n":
+            if block_lines:
+                yield "".join(block_lines).strip()
+                block_lines = []
             continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
+        if not block_lines:
+            # A fence is ``` plus an optional info string; a line such as
+            # "```ls``` lists files" is inline code in a paragraph.
+            stripped = line.strip()
+            in_fence = stripped.startswith("```") and "`" not in stripped[3:]
+        block_lines.append(line)
+    if not block_lines:
+        return
+    if in_fence:
+        # An unclosed fence is not code; split it like any other text.
+        for block in "".join(block_lines).split("\n\n"):
+            if block.strip():
+                yield block.strip()
+        return
+    yield "".join(block_lines).strip()
 
 
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return classify_block(block)[0]
+
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return BlockType.HEADING
-    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
-        return BlockType.CODE
-    if block.startswith(">"):
+def classify_block(block):
+    lines = block.split("\n")
+    first = lines[0]
+
+    if first.startswith(HEADING_PREFIXES):
+        return BlockType.HEADING, lines
+    if len(lines) > 1 and first.startswith("```") and lines[-1].startswith("```"):
+        return BlockType.CODE, lines
+    if first.startswith(">"):
+        stripped = []
         for line in lines:
             if not line.startswith(">"):
-                return BlockType.PARAGRAPH
-        return BlockType.QUOTE
-    if block.startswith("- "):
+                return BlockType.PARAGRAPH, lines
+            stripped.append(line.lstrip(">").strip())
+        return BlockType.QUOTE, stripped
+    if first.startswith("- "):
+        items = []
         for line in lines:
             if not line.startswith("- "):
-                return BlockType.PARAGRAPH
-        return BlockType.ULIST
-    if block.startswith("1. "):
-        i = 1
-        for line in lines:
-            if not line.startswith(f"{i}. "):
-                return BlockType.PARAGRAPH
-            i += 1
-        return BlockType.OLIST
-    return BlockType.PARAGRAPH
+                return BlockType.PARAGRAPH, lines
+            items.append(line[2:])
+        return BlockType.ULIST, items
+    if first.startswith("1. "):
+        items = []
+        for i, line in enumerate(lines, 1):
+            dot = line.find(". ")
+            # Comparing with str(i) rejects non-ASCII digits such as "²",
+            # which str.isdigit() accepts but int() does not.
+            if dot < 1 or line[:dot] != str(i):
+                return BlockType.PARAGRAPH, lines
+            items.append(line[dot + 2 :])
+        return BlockType.OLIST, items
+    return BlockType.PARAGRAPH, lines
+
+
+def markdown_to_html_node(markdown, cache=None, resolver=None):
+    with profiling.stage("block split", len(markdown)):
+        blocks = markdown_to_blocks(markdown)
+    children = list(blocks_to_html_nodes(blocks, cache, resolver))
+    return ParentNode("div", children, None)
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode("div", children, None)
+def iter_markdown_html(lines, cache=None, resolver=None):
+    blocks = profiling.iter_stage("block split", iter_blocks(lines))
+    yield "<div>"
+    for html_node in blocks_to_html_nodes(blocks, cache, resolver):
+        yield from html_node.iter_html()
+    yield "</div>"
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def blocks_to_html_nodes(blocks, cache=None, resolver=None):
+    for block in blocks:
+        with profiling.stage("node build"):
+            if cache is None:
+                html_node = block_to_html_node(block, resolver)
+            else:
+                html_node = cached_block_to_html_node(block, cache, resolver)
+        yield html_node
+
+
+def cached_block_to_html_node(block, cache, resolver=None):
+    if resolver is None:
+        resolver = UrlResolver()
+    entry = cache.get_entry(block)
+    if entry is not None:
+        html, links = entry
+        # Fingerprinted names change with the asset, not with the block.
+        if not any(link in resolver.assets for link in links):
+            resolver.links.extend(links)
+            return LeafNode(None, html)
+    start = len(resolver.links)
+    html = block_to_html_node(block, resolver).to_html()
+    cache.put(block, html, resolver.links[start:])
+    return LeafNode(None, html)
+
+
+def block_to_html_node(block, resolver=None):
+    with profiling.stage("block typing"):
+        block_type, lines = classify_block(block)
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(lines, resolver)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, resolver)
     if block_type == BlockType.CODE:
         return code_to_html_node(block)
     if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(lines, resolver)
     if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(lines, resolver)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(lines, resolver)
     raise ValueError("invalid block type")
 
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+def text_to_children(text, resolver=None):
+    with profiling.stage("inline parse", len(text)):
+        text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolver)
         children.append(html_node)
     return children
 
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(lines, resolver=None):
     paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph, resolver)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, resolver=None):
     level = 0
     for char in block:
         if char == "#":
             level += 1
         else:
             break
-    if level + 1 >= len(block):
+    if level + 1 >= len(block) or not 1 <= level <= len(HEADING_TAGS):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1 :]
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    children = text_to_children(text, resolver)
+    return ParentNode(HEADING_TAGS[level - 1], children)
 
 
 def code_to_html_node(block):
@@ -118,33 +203,23 @@ def code_to_html_node(block):
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(items, resolver=None):
     html_items = []
     for item in items:
-        text = item[3:]
-        children = text_to_children(text)
+        children = text_to_children(item, resolver)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(items, resolver=None):
     html_items = []
     for item in items:
-        text = item[2:]
-        children = text_to_children(text)
+        children = text_to_children(item, resolver)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
-    new_lines = []
-    for line in lines:
-        if not line.startswith(">"):
-            raise ValueError("invalid quote block")
-        new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
+def quote_to_html_node(lines, resolver=None):
+    content = " ".join(lines)
+    children = text_to_children(content, resolver)
     return ParentNode("blockquote", children)
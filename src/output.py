@@ -0,0 +1,60 @@
+import hashlib
+import os
+import time
+
+import profiling
+from manifest import hash_file
+
+
+def write_if_changed(dest_path, chunks):
+    dest_path = str(dest_path)
+    tmp_path = f"{dest_path}.tmp{os.getpid()}"
+    digest = hashlib.sha256()
+    size = 0
+    profiler = profiling.current()
+    try:
+        with open(tmp_path, "wb") as tmp_file:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                digest.update(data)
+                size += len(data)
+                if profiler is None:
+                    tmp_file.write(data)
+                    continue
+                start = time.perf_counter()
+                tmp_file.write(data)
+                profiler.add("write", time.perf_counter() - start, len(data))
+        with profiling.stage("write"):
+            if is_same_file(dest_path, size, digest.hexdigest()):
+                return False
+            os.replace(tmp_path, dest_path)
+            return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def is_same_file(path, size, digest):
+    try:
+        if os.path.getsize(path) != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == digest
+
+
+def check_output_dir(dest_dir_path, sources):
+    # Builds delete stale outputs, so they must never own a source tree.
+    dest = os.path.realpath(dest_dir_path)
+    for path in (os.getcwd(), *sources):
+        path = os.path.realpath(path)
+        if os.path.commonpath([dest, path]) == dest:
+            raise ValueError(f"output directory {dest_dir_path} contains {path}")
+
+
+def write_changed_files(path, changed, removed, root):
+    with open(path, "w") as f:
+        for changed_path in changed:
+            f.write(f"M\t{os.path.relpath(changed_path, root)}\n")
+        for removed_path in removed:
+            f.write(f"D\t{os.path.relpath(removed_path, root)}\n")
@@ -0,0 +1,132 @@
+import io
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+from frontmatter import read_front_matter
+from gencontent import page_title, render_page_chunks
+from output import write_if_changed
+from urls import UrlResolver
+
+
+class PagePipeline:
+    def __init__(self, readers=4, writers=4, queue_depth=16):
+        self.readers = max(1, readers)
+        self.writers = max(1, writers)
+        self.queue_depth = max(1, queue_depth)
+
+    def run(
+        self,
+        pages,
+        template_path,
+        basepath,
+        cache=None,
+        links=None,
+        site=None,
+        assets=None,
+    ):
+        changed = []
+        failures = []
+        profiler = profiling.current()
+        pages = iter(pages)
+        reads = deque()
+        writes = deque()
+
+        def finish_write():
+            from_path, dest_path, future = writes.popleft()
+            try:
+                if future.result():
+                    changed.append(dest_path)
+            except Exception as e:
+                print(f" ! {from_path}: {_format_error(e)}")
+                failures.append(from_path)
+
+        read_pool = ThreadPoolExecutor(self.readers)
+        write_pool = ThreadPoolExecutor(self.writers)
+        with read_pool, write_pool:
+            for from_path, dest_path in pages:
+                reads.append((from_path, dest_path, read_pool.submit(_read, from_path)))
+                if len(reads) >= self.queue_depth:
+                    break
+
+            while reads:
+                from_path, dest_path, future = reads.popleft()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    reads.append((*next_page, read_pool.submit(_read, next_page[0])))
+
+                print(f" * {from_path} {template_path} -> {dest_path}")
+                if profiler is not None:
+                    profiler.begin_page(from_path)
+                resolver = UrlResolver(basepath, assets)
+                meta = None if site is None else site.get(dest_path)
+                try:
+                    html = self.render(
+                        future, template_path, basepath, cache, resolver, meta
+                    )
+                except Exception as e:
+                    print(f" ! {from_path}: {_format_error(e)}")
+                    failures.append(from_path)
+                    continue
+                finally:
+                    if profiler is not None:
+                        profiler.end_page()
+                if links is not None:
+                    links.add(dest_path, resolver.links)
+
+                while len(writes) >= self.queue_depth:
+                    finish_write()
+                writes.append(
+                    (from_path, dest_path, write_pool.submit(_write, dest_path, html))
+                )
+
+            while writes:
+                finish_write()
+
+        if failures:
+            raise RuntimeError(f"{len(failures)} page(s) failed to build")
+        return changed
+
+    def render(
+        self, read_future, template_path, basepath, cache, resolver=None, meta=None
+    ):
+        with profiling.stage("read"):
+            markdown = read_future.result()
+            source = io.StringIO(markdown)
+            metadata = read_front_matter(source)
+            if meta is not None and meta.title is not None:
+                title = meta.title
+            else:
+                title = page_title(source, metadata)
+        chunks = render_page_chunks(
+            source,
+            title,
+            template_path,
+            basepath,
+            cache,
+            resolver,
+            meta,
+            metadata,
+        )
+        html = "".join(chunks)
+        if cache is not None:
+            cache.flush()
+        return html
+
+
+def _read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _write(dest_path, html):
+    dest_dir_path = os.path.dirname(dest_path)
+    if dest_dir_path != "":
+        os.makedirs(dest_dir_path, exist_ok=True)
+    return write_if_changed(dest_path, [html])
+
+
+def _format_error(e):
+    return "".join(traceback.format_exception_only(type(e), e)).strip()
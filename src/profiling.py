@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+
+
+STAGES = (
+    "read",
+    "block split",
+    "block typing",
+    "inline parse",
+    "node build",
+    "serialize",
+    "template",
+    "write",
+)
+
+active = None
+
+
+class _NullStage:
+    nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+_DONE = object()
+
+
+def current():
+    if active is None or active.thread_id != threading.get_ident():
+        return None
+    return active
+
+
+def stage(name, nbytes=0):
+    profiler = current()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name, nbytes)
+
+
+def iter_stage(name, iterable):
+    if current() is None:
+        return iterable
+    return _iter_stage(name, iter(iterable))
+
+
+def _iter_stage(name, iterator):
+    while True:
+        with stage(name) as item_stage:
+            item = next(iterator, _DONE)
+            if item is not _DONE:
+                item_stage.nbytes = len(item)
+        if item is _DONE:
+            return
+        yield item
+
+
+class _Stage:
+    def __init__(self, profiler, name, nbytes):
+        self.profiler = profiler
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.child_seconds = 0.0
+        self.profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += elapsed
+        else:
+            self.profiler._event(self.name, self.start, elapsed)
+        self.profiler.add(self.name, elapsed - self.child_seconds, self.nbytes)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.thread_id = threading.get_ident()
+        self.pages = []
+        self._page = None
+        self._stack = []
+
+    def stage(self, name, nbytes=0):
+        return _Stage(self, name, nbytes)
+
+    def add(self, name, seconds, nbytes=0):
+        if self._page is None:
+            return
+        totals = self._page["stages"].setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += nbytes
+
+    def begin_page(self, path):
+        self._page = {
+            "path": str(path),
+            "pid": os.getpid(),
+            "start": time.perf_counter(),
+            "seconds": 0.0,
+            "stages": {},
+            "events": [],
+        }
+
+    def end_page(self):
+        page = self._page
+        page["seconds"] = time.perf_counter() - page["start"]
+        self._page = None
+        self.pages.append(page)
+        return page
+
+    def add_page(self, page):
+        self.pages.append(page)
+
+    def _event(self, name, start, seconds):
+        if self._page is None:
+            return
+        events = self._page["events"]
+        if events and events[-1][0] == name:
+            events[-1][2] = start + seconds - events[-1][1]
+            events[-1][3] += 1
+            return
+        events.append([name, start, seconds, 1])
+
+    def stage_totals(self):
+        totals = {name: [0.0, 0] for name in STAGES}
+        for page in self.pages:
+            for name, (seconds, nbytes) in page["stages"].items():
+                stage_total = totals.setdefault(name, [0.0, 0])
+                stage_total[0] += seconds
+                stage_total[1] += nbytes
+        return totals
+
+    def summary(self, top=10):
+        totals = self.stage_totals()
+        total_seconds = sum(seconds for seconds, _ in totals.values())
+        lines = [f"Profiled {len(self.pages)} page(s):"]
+        for name, (seconds, nbytes) in sorted(
+            totals.items(), key=lambda item: item[1][0], reverse=True
+        ):
+            share = seconds / total_seconds if total_seconds else 0.0
+            lines.append(
+                f"   {name:<14} {seconds * 1000:10.1f}ms {share:6.1%} {nbytes:>12}B"
+            )
+        lines.append(f"Slowest {min(top, len(self.pages))} page(s):")
+        slowest = sorted(self.pages, key=lambda page: page["seconds"], reverse=True)
+        for page in slowest[:top]:
+            stages = page["stages"]
+            worst = max(stages, key=lambda name: stages[name][0], default="-")
+            lines.append(
+                f"   {page['seconds'] * 1000:10.1f}ms {page['path']} (mostly {worst})"
+            )
+        return "\n".join(lines)
+
+    def trace_events(self):
+        if not self.pages:
+            return []
+        origin = min(page["start"] for page in self.pages)
+        events = []
+        for page in self.pages:
+            pid = page["pid"]
+            events.append(
+                {
+                    "name": page["path"],
+                    "cat": "page",
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": pid,
+                    "ts": (page["start"] - origin) * 1e6,
+                    "dur": page["seconds"] * 1e6,
+                    "args": {
+                        name: {"ms": seconds * 1000, "bytes": nbytes}
+                        for name, (seconds, nbytes) in page["stages"].items()
+                    },
+                }
+            )
+            for name, start, seconds, count in page["events"]:
+                events.append(
+                    {
+                        "name": name,
+                        "cat": "stage",
+                        "ph": "X",
+                        "pid": pid,
+                        "tid": pid,
+                        "ts": (start - origin) * 1e6,
+                        "dur": seconds * 1e6,
+                        "args": {"count": count},
+                    }
+                )
+        return events
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events()}, f)
@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import zlib
+
+from copystatic import copy_file, is_unchanged
+from manifest import DATA_SECTIONS, BuildManifest, hash_file
+from output import check_output_dir
+from sourceindex import SourceEntry
+
+
+SHARD_MANIFEST_NAME = ".shard_manifest.json"
+SHARD_ROOT = "./.shards"
+
+
+def parse_shard(value):
+    index, sep, count = value.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 1..{count}")
+    return index, count
+
+
+def shard_of(rel_path, count):
+    return zlib.crc32(rel_path.encode()) % count + 1
+
+
+def in_shard(rel_path, shard):
+    index, count = shard
+    return shard_of(rel_path, count) == index
+
+
+def shard_output_dir(shard):
+    index, count = shard
+    return os.path.join(SHARD_ROOT, f"{index}-of-{count}")
+
+
+def load_shard_manifest(shard_dir):
+    with open(os.path.join(shard_dir, SHARD_MANIFEST_NAME), "r") as f:
+        data = json.load(f)
+    if "shard" not in data or "output" not in data:
+        raise ValueError(f"{shard_dir} is not a shard build")
+    return data
+
+
+def merge_shards(shard_dirs, dest_dir_path, manifest_path):
+    check_output_dir(dest_dir_path, shard_dirs)
+    shards = [(shard_dir, load_shard_manifest(shard_dir)) for shard_dir in shard_dirs]
+    if not shards:
+        raise ValueError("no shards to merge")
+    _check_shard_set(shards)
+
+    outputs = {}
+    conflicts = []
+    for shard_dir, data in shards:
+        for section, entries in data.items():
+            if not isinstance(entries, dict) or section in DATA_SECTIONS:
+                continue
+            for path, digest in entries.items():
+                rel_path = os.path.relpath(path, data["output"])
+                from_path = os.path.join(shard_dir, rel_path)
+                owner = outputs.get(rel_path)
+                if owner is None:
+                    outputs[rel_path] = (from_path, section, digest)
+                elif hash_file(owner[0]) != hash_file(from_path):
+                    conflicts.append(f"{rel_path} ({owner[0]}, {from_path})")
+    if conflicts:
+        raise RuntimeError(
+            f"{len(conflicts)} conflicting output(s): " + ", ".join(sorted(conflicts))
+        )
+
+    first = shards[0][1]
+    manifest = BuildManifest(manifest_path, first["template"], first["basepath"])
+    manifest.output = os.path.normpath(dest_dir_path)
+    manifest.load(reuse=False)
+    os.makedirs(dest_dir_path, exist_ok=True)
+    copied = []
+    for rel_path in sorted(outputs):
+        from_path, section, digest = outputs[rel_path]
+        dest_path = os.path.join(dest_dir_path, rel_path)
+        manifest.record(section, dest_path, digest)
+        stat = os.stat(from_path)
+        entry = SourceEntry(rel_path, from_path, stat.st_size, stat.st_mtime_ns)
+        if is_unchanged(from_path, entry, dest_path):
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        copy_file(from_path, dest_path)
+        copied.append(dest_path)
+    for _, data in shards:
+        for section in DATA_SECTIONS:
+            for path, value in data.get(section, {}).items():
+                rel_path = os.path.relpath(path, data["output"])
+                manifest.record(section, os.path.join(dest_dir_path, rel_path), value)
+
+    removed = manifest.prune()
+    manifest.save()
+    return copied, removed
+
+
+def _check_shard_set(shards):
+    first = shards[0][1]
+    count = first["shard"][1]
+    indexes = set()
+    for shard_dir, data in shards:
+        for key in ("template", "basepath"):
+            if data.get(key) != first.get(key):
+                raise ValueError(f"{shard_dir} was built with a different {key}")
+        index, shard_count = data["shard"]
+        if shard_count != count:
+            raise ValueError(
+                f"{shard_dir} is shard {index}/{shard_count}, expected one of {count}"
+            )
+        if index in indexes:
+            raise ValueError(f"shard {index}/{count} given more than once")
+        indexes.add(index)
+    missing = sorted(set(range(1, count + 1)) - indexes)
+    if missing:
+        raise ValueError(f"missing shard(s) {missing} of {count}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Merge sharded builds into one tree.")
+    parser.add_argument("dest", help="directory to merge the shard outputs into")
+    parser.add_argument("shards", nargs="+", help="output directories of each shard")
+    parser.add_argument(
+        "--manifest",
+        default="./.build_manifest.json",
+        help="where to write the merged build manifest",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        copied, removed = merge_shards(args.shards, args.dest, args.manifest)
+    except (RuntimeError, ValueError) as e:
+        print(f" ! {e}")
+        return 1
+    for dest_path in copied:
+        print(f" * {dest_path}")
+    for dest_path in removed:
+        print(f" * removed {dest_path}")
+    print(f"Merged {len(args.shards)} shard(s) into {args.dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+import datetime
+import hashlib
+import os
+from email.utils import format_datetime
+from xml.sax.saxutils import escape as xml_escape
+
+import profiling
+from frontmatter import is_published, read_front_matter
+from htmlescape import escape_text
+from htmlnode import LeafNode, ParentNode
+from template import load_template, resolve_template_path
+from textnode import TextNode, TextType, text_node_to_html_node
+from urls import UrlResolver
+
+
+BLOG_SECTION = "blog"
+BLOG_TITLE = "Blog"
+FEED_NAME = "feed.xml"
+
+
+class PageMeta:
+    __slots__ = ("from_path", "dest_path", "url", "title", "metadata", "prev", "next")
+
+    def __init__(self, from_path, dest_path, url, title, metadata=None):
+        self.from_path = from_path
+        self.dest_path = dest_path
+        self.url = url
+        self.title = title
+        self.metadata = metadata if metadata is not None else {}
+        self.prev = None
+        self.next = None
+
+    def date(self):
+        value = self.metadata.get("date")
+        return None if value is None else str(value)
+
+    def sort_key(self):
+        return (self.date() or "", self.url)
+
+    def nav_html(self, resolver):
+        links = []
+        for rel, neighbour in (("prev", self.prev), ("next", self.next)):
+            if neighbour is not None:
+                url, title = neighbour
+                props = {"href": resolver.resolve(url), "rel": rel}
+                links.append(LeafNode("a", escape_text(title), props))
+        if not links:
+            return ""
+        return ParentNode("nav", links).to_html()
+
+    def __repr__(self):
+        return f"PageMeta({self.url}, {self.title})"
+
+
+class SiteIndex:
+    def __init__(self, dest_dir_path, pages):
+        self.dest_dir_path = dest_dir_path
+        self.pages = {os.path.normpath(meta.dest_path): meta for meta in pages}
+        self.posts = []
+        self.link_posts()
+
+    def link_posts(self):
+        for meta in self.posts:
+            meta.prev = None
+            meta.next = None
+        section = f"/{BLOG_SECTION}/"
+        self.posts = sorted(
+            (
+                meta
+                for meta in self.pages.values()
+                if meta.url.startswith(section) and meta.title is not None
+            ),
+            key=PageMeta.sort_key,
+        )
+        for older, newer in zip(self.posts, self.posts[1:]):
+            newer.prev = (older.url, older.title)
+            older.next = (newer.url, newer.title)
+
+    def update(self, changed, removed, drafts=False):
+        # Re-reads only the changed pages; returns the pages whose nav moved.
+        before = {
+            os.path.normpath(meta.dest_path): (meta.prev, meta.next)
+            for meta in self.posts
+        }
+        for dest_path in removed:
+            self.pages.pop(os.path.normpath(dest_path), None)
+        for from_path, dest_path in changed:
+            meta = read_page_meta(from_path, dest_path, self.dest_dir_path, drafts)
+            if meta is None:
+                self.pages.pop(os.path.normpath(dest_path), None)
+            else:
+                self.pages[os.path.normpath(dest_path)] = meta
+        self.link_posts()
+        return {
+            dest_path
+            for dest_path, meta in self.pages.items()
+            if before.get(dest_path, (None, None)) != (meta.prev, meta.next)
+        }
+
+    def get(self, dest_path):
+        return self.pages.get(os.path.normpath(dest_path))
+
+    def page_digest(self, dest_path, digest):
+        meta = self.get(dest_path)
+        if meta is None or (meta.prev is None and meta.next is None):
+            return digest
+        nav = hashlib.sha256(repr((meta.prev, meta.next)).encode()).hexdigest()
+        return f"{digest}:{nav[:16]}"
+
+    def template_path(self, dest_path, template_path):
+        meta = self.get(dest_path)
+        name = None if meta is None else meta.metadata.get("template")
+        return resolve_template_path(template_path, name)
+
+    def dependency_graph(self, template_path, basepath, dest_paths=None):
+        if dest_paths is None:
+            dest_paths = self.pages
+        templates = {}
+        graph = {}
+        for dest_path in dest_paths:
+            dest_path = os.path.normpath(dest_path)
+            if dest_path not in self.pages:
+                continue
+            path = self.template_path(dest_path, template_path)
+            if path not in templates:
+                try:
+                    templates[path] = load_template(path, basepath).dependencies
+                except (OSError, ValueError):
+                    # The page reports the error when it is rendered.
+                    templates[path] = (path,)
+            graph[dest_path] = templates[path]
+        return graph
+
+    def listing_path(self):
+        return os.path.join(self.dest_dir_path, BLOG_SECTION, "index.html")
+
+    def feed_path(self):
+        return os.path.join(self.dest_dir_path, BLOG_SECTION, FEED_NAME)
+
+    def generated_pages(self, template_path, basepath, site_url="", assets=None):
+        if not self.posts:
+            return []
+        pages = []
+        listing_path = self.listing_path()
+        if self.get(listing_path) is None:
+            resolver = UrlResolver(basepath, assets)
+            pages.append(
+                (
+                    listing_path,
+                    self.render_listing(template_path, basepath, resolver),
+                    resolver.links,
+                )
+            )
+        pages.append((self.feed_path(), [self.render_feed(basepath, site_url)], []))
+        return pages
+
+    def render_listing(self, template_path, basepath, resolver):
+        items = [
+            ParentNode(
+                "li",
+                [
+                    text_node_to_html_node(
+                        TextNode(meta.title, TextType.LINK, meta.url), resolver
+                    )
+                ],
+            )
+            for meta in self.posts
+        ]
+        content = ParentNode(
+            "div", [LeafNode("h1", BLOG_TITLE), ParentNode("ul", items)]
+        )
+        template = load_template(template_path, basepath, resolver.assets)
+        values = {"Title": BLOG_TITLE, "Content": content.iter_html()}
+        return template.iter_render(values)
+
+    def render_feed(self, basepath, site_url=""):
+        resolver = UrlResolver(basepath)
+        site_url = site_url.rstrip("/")
+        channel_link = site_url + resolver.resolve(f"/{BLOG_SECTION}")
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<rss version="2.0"><channel>',
+            f"<title>{BLOG_TITLE}</title>",
+            f"<link>{xml_escape(channel_link)}</link>",
+            f"<description>{BLOG_TITLE}</description>",
+        ]
+        for meta in reversed(self.posts):
+            link = xml_escape(site_url + resolver.resolve(meta.url))
+            parts.append(
+                f"<item><title>{xml_escape(meta.title)}</title>"
+                f"<link>{link}</link><guid>{link}</guid>"
+            )
+            pub_date = rfc822_date(meta.date())
+            if pub_date is not None:
+                parts.append(f"<pubDate>{pub_date}</pubDate>")
+            parts.append("</item>")
+        parts.append("</channel></rss>\n")
+        return "".join(parts)
+
+
+def build_site_index(pages, dest_dir_path, drafts=False):
+    metas = []
+    for from_path, dest_path in pages:
+        meta = read_page_meta(from_path, dest_path, dest_dir_path, drafts)
+        if meta is not None:
+            metas.append(meta)
+    return SiteIndex(dest_dir_path, metas)
+
+
+def read_page_meta(from_path, dest_path, dest_dir_path, drafts=False):
+    with profiling.stage("read"):
+        with open(from_path, "r") as f:
+            try:
+                metadata = read_front_matter(f)
+                title = metadata.get("title")
+                if title is None:
+                    title = extract_title_from_lines(f)
+            except ValueError:
+                # Reported when the page itself is rendered.
+                metadata, title = {}, None
+    if not drafts and not is_published(metadata):
+        return None
+    url = page_url(dest_path, dest_dir_path)
+    if title is not None:
+        title = str(title)
+    return PageMeta(from_path, dest_path, url, title, metadata)
+
+
+def rfc822_date(value):
+    if value is None:
+        return None
+    try:
+        date = datetime.date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+    midnight = datetime.datetime.combine(date, datetime.time(), datetime.timezone.utc)
+    return format_datetime(midnight)
+
+
+def page_url(dest_path, dest_dir_path):
+    rel_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        rel_path = rel_path[: -len("/index.html")]
+    return "/" + rel_path
+
+
+def extract_title_from_lines(lines):
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:].rstrip("\n")
+    raise ValueError("no title found")
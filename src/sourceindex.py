@@ -0,0 +1,41 @@
+import os
+
+
+class SourceEntry:
+    __slots__ = ("rel_path", "path", "size", "mtime_ns")
+
+    def __init__(self, rel_path, path, size, mtime_ns):
+        self.rel_path = rel_path
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def signature(self):
+        return (self.mtime_ns, self.size)
+
+    def __repr__(self):
+        return f"SourceEntry({self.rel_path}, {self.size}, {self.mtime_ns})"
+
+
+def scan_tree(root):
+    if os.path.isfile(root):
+        stat = os.stat(root)
+        name = os.path.basename(root)
+        return [SourceEntry(name, root, stat.st_size, stat.st_mtime_ns)]
+    entries = []
+    stack = [((), root)]
+    while stack:
+        rel_parts, dir_path = stack.pop()
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                parts = rel_parts + (entry.name,)
+                if entry.is_dir():
+                    stack.append((parts, entry.path))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    source_entry = SourceEntry(
+                        "/".join(parts), entry.path, stat.st_size, stat.st_mtime_ns
+                    )
+                    entries.append((parts, source_entry))
+    entries.sort(key=lambda item: item[0])
+    return [entry for _, entry in entries]
@@ -0,0 +1,108 @@
+import os
+import re
+
+from urls import UrlResolver
+
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+PARTIAL_RE = re.compile(r"\{\{>\s*([^\s}]+)\s*\}\}")
+URL_ATTR_RE = re.compile(r'\b(href|src)="(/[^"]*)"')
+
+_template_cache = {}
+
+
+class Template:
+    def __init__(self, segments, dependencies=()):
+        self.segments = segments
+        self.dependencies = dependencies
+
+    def placeholders(self):
+        return [name for is_placeholder, name in self.segments if is_placeholder]
+
+    def iter_render(self, values):
+        for is_placeholder, text in self.segments:
+            if not is_placeholder:
+                yield text
+                continue
+            value = values.get(text, "")
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def __repr__(self):
+        return f"Template({self.segments})"
+
+
+def compile_template(source):
+    segments = []
+    pos = 0
+    for match in PLACEHOLDER_RE.finditer(source):
+        if match.start() > pos:
+            segments.append((False, source[pos : match.start()]))
+        segments.append((True, match.group(1)))
+        pos = match.end()
+    if pos < len(source):
+        segments.append((False, source[pos:]))
+    return Template(segments)
+
+
+def load_template(template_path, basepath, assets=None):
+    key = (template_path, basepath)
+    cached = _template_cache.get(key)
+    if (
+        cached is not None
+        and cached[0] == _signatures(cached[1].dependencies)
+        and (cached[2] is assets or cached[2] == assets)
+    ):
+        return cached[1]
+    dependencies = []
+    source = _read_with_partials(template_path, dependencies, ())
+    template = compile_template(rewrite_basepath(source, basepath, assets))
+    template.dependencies = tuple(dependencies)
+    _template_cache[key] = (_signatures(template.dependencies), template, assets)
+    return template
+
+
+def resolve_template_path(template_path, name):
+    if name is None:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), str(name))
+
+
+def _read_with_partials(path, dependencies, including):
+    if path in including:
+        chain = " -> ".join(including + (path,))
+        raise ValueError(f"partial include cycle: {chain}")
+    if path not in dependencies:
+        dependencies.append(path)
+    with open(path, "r") as f:
+        source = f.read()
+    dir_path = os.path.dirname(path)
+    return PARTIAL_RE.sub(
+        lambda match: _read_with_partials(
+            os.path.join(dir_path, match.group(1)), dependencies, including + (path,)
+        ),
+        source,
+    )
+
+
+def _signatures(paths):
+    signatures = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signatures.append((stat.st_mtime_ns, stat.st_size))
+    return signatures
+
+
+def rewrite_basepath(html, basepath, assets=None):
+    resolver = UrlResolver(basepath, assets)
+    return URL_ATTR_RE.sub(
+        lambda match: f'{match.group(1)}="{resolver.resolve(match.group(2))}"', html
+    )
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from assets import (
+    ASSETS_MANIFEST_NAME,
+    copy_fingerprinted,
+    fingerprinted_name,
+    is_fingerprinted,
+)
+from manifest import BuildManifest
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "tom.png"), "png bytes")
+        self.write("robots.txt", "User-agent: *")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.static, rel_path), "w") as f:
+            f.write(text)
+
+    def sync(self):
+        manifest = BuildManifest(self.manifest_path, "t", "/")
+        manifest.load()
+        assets, copied = copy_fingerprinted(self.static, self.dest, manifest)
+        manifest.prune()
+        manifest.save()
+        return assets, sorted(os.path.relpath(path, self.dest) for path in copied)
+
+    def test_names(self):
+        self.assertEqual(
+            fingerprinted_name("images/tom.png", "0123456789abcdef"),
+            "images/tom.01234567.png",
+        )
+        self.assertEqual(
+            fingerprinted_name("LICENSE", "0123456789"), "LICENSE.01234567"
+        )
+        self.assertTrue(is_fingerprinted("index.css"))
+        self.assertFalse(is_fingerprinted("robots.txt"))
+        self.assertFalse(is_fingerprinted("docs/page.html"))
+
+    def test_copies_under_hashed_names(self):
+        assets, copied = self.sync()
+        css = assets["/index.css"]
+        self.assertRegex(css, r"^/index\.[0-9a-f]{8}\.css$")
+        self.assertRegex(assets["/images/tom.png"], r"^/images/tom\.[0-9a-f]{8}\.png$")
+        self.assertNotIn("/robots.txt", assets)
+        tom = assets["/images/tom.png"]
+        self.assertEqual(
+            copied, sorted([ASSETS_MANIFEST_NAME, css[1:], tom[1:], "robots.txt"])
+        )
+        with open(os.path.join(self.dest, css[1:])) as f:
+            self.assertEqual(f.read(), "body {}")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        with open(os.path.join(self.dest, ASSETS_MANIFEST_NAME)) as f:
+            self.assertEqual(json.load(f)["index.css"], css[1:])
+
+    def test_second_sync_is_noop(self):
+        first, _ = self.sync()
+        assets, copied = self.sync()
+        self.assertEqual(assets, first)
+        self.assertEqual(copied, [])
+
+    def test_changed_asset_gets_new_name(self):
+        first, _ = self.sync()
+        self.write("index.css", "body { color: red; }")
+        assets, copied = self.sync()
+        self.assertNotEqual(assets["/index.css"], first["/index.css"])
+        css = assets["/index.css"][1:]
+        self.assertEqual(copied, sorted([ASSETS_MANIFEST_NAME, css]))
+        old_css = os.path.join(self.dest, first["/index.css"][1:])
+        self.assertFalse(os.path.exists(old_css))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from benchmark import compare_results, generate_corpus, run_benchmarks
+from gencontent import find_pages
+from markdown_blocks import markdown_to_html_node
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_corpus(self):
+        with tempfile.TemporaryDirectory() as root:
+            content_dir, template_path = generate_corpus(root, pages=12, blocks=12)
+            pages = find_pages(content_dir, os.path.join(root, "docs"))
+            self.assertEqual(len(pages), 12)
+            self.assertTrue(os.path.isfile(template_path))
+            for from_path, _ in pages:
+                with open(from_path) as f:
+                    markdown_to_html_node(f.read())
+
+    def test_generate_corpus_deterministic(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            generate_corpus(a, pages=3, seed=7)
+            generate_corpus(b, pages=3, seed=7)
+            path = os.path.join("content", "section-2", "page-2", "index.md")
+            with open(os.path.join(a, path)) as fa, open(os.path.join(b, path)) as fb:
+                self.assertEqual(fa.read(), fb.read())
+
+    def test_run_benchmarks(self):
+        with tempfile.TemporaryDirectory() as root:
+            generate_corpus(root, pages=4, blocks=6)
+            results = run_benchmarks(root, repeat=1)
+        self.assertEqual(results["pages"], 4)
+        self.assertGreater(results["memory"]["nodes"], 4)
+        self.assertGreater(results["memory"]["bytes_per_node"], 0)
+        self.assertEqual(
+            list(results["stages"]),
+            [
+                "text_to_textnodes",
+                "markdown_to_html_node",
+                "to_html",
+                "html_escape",
+                "generate_pages_recursive",
+                "block_to_block_type",
+                "list_heavy_page",
+                "quote_heavy_page",
+            ],
+        )
+
+    def test_compare_results(self):
+        baseline = {"stages": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}}}
+        current = {"stages": {"a": {"seconds": 1.5}, "b": {"seconds": 0.9}}}
+        rows = compare_results(baseline, current, threshold=0.10)
+        self.assertEqual(
+            [(row[0], row[4]) for row in rows], [("a", True), ("b", False)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from blockcache import BlockCache
+from markdown_blocks import iter_markdown_html, markdown_to_html_node
+from urls import UrlResolver
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "blocks.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_get(self):
+        cache = BlockCache(self.path, 1)
+        self.assertIsNone(cache.get("# title"))
+        cache.put("# title", "<h1>title</h1>")
+        cache.flush()
+        self.assertEqual(cache.get("# title"), "<h1>title</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+    def test_links_round_trip(self):
+        cache = BlockCache(self.path, 1)
+        cache.put("[a](/a) ![b](/b.png)", "<p>...</p>", ["/a", "/b.png"])
+        cache.put("text", "<p>text</p>")
+        cache.flush()
+        self.assertEqual(
+            cache.get_entry("[a](/a) ![b](/b.png)"), ("<p>...</p>", ["/a", "/b.png"])
+        )
+        self.assertEqual(cache.get_entry("text"), ("<p>text</p>", []))
+        cache.close()
+
+    def test_cached_blocks_replay_links(self):
+        md = "[home](/)\n\n![tom](/images/tom.png)"
+        cache = BlockCache(self.path, 1)
+        for _ in range(2):
+            resolver = UrlResolver("/base/")
+            markdown_to_html_node(md, cache, resolver)
+            cache.flush()
+            self.assertEqual(resolver.links, ["/", "/images/tom.png"])
+        self.assertEqual(cache.hits, 2)
+        cache.close()
+
+    def test_fingerprinted_blocks_rerender(self):
+        md = "![tom](/images/tom.png)"
+        cache = BlockCache(self.path, 1)
+        for hashed in ("/images/tom.1.png", "/images/tom.2.png"):
+            resolver = UrlResolver("/", {"/images/tom.png": hashed})
+            node = markdown_to_html_node(md, cache, resolver)
+            cache.flush()
+            self.assertIn(hashed, node.to_html())
+        self.assertEqual(cache.hits, 1)
+        cache.close()
+
+    def test_persists_across_instances(self):
+        cache = BlockCache(self.path, 1)
+        cache.put("# title", "<h1>title</h1>")
+        cache.close()
+        cache = BlockCache(self.path, 1)
+        self.assertEqual(cache.get("# title"), "<h1>title</h1>")
+        cache.close()
+
+    def test_version_change_misses(self):
+        cache = BlockCache(self.path, 1)
+        cache.put("# title", "<h1>title</h1>")
+        cache.close()
+        cache = BlockCache(self.path, 2)
+        self.assertIsNone(cache.get("# title"))
+        cache.close()
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = BlockCache(self.path, 1, max_bytes=20)
+        cache.put("a", "x" * 10)
+        cache.flush()
+        cache.put("b", "y" * 10)
+        cache.flush()
+        cache.get("a")
+        cache.put("c", "z" * 10)
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 10)
+        self.assertEqual(cache.get("c"), "z" * 10)
+        cache.close()
+
+    def test_markdown_to_html_node_with_cache(self):
+        md = """
+# title
+
+- a **list**
+- of items
+
+> a quote
+"""
+        cache = BlockCache(self.path, 1)
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        cache.flush()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+        edited = md.replace("> a quote", "> an edited quote")
+        self.assertEqual(
+            markdown_to_html_node(edited, cache).to_html(),
+            markdown_to_html_node(edited).to_html(),
+        )
+        self.assertEqual((cache.hits, cache.misses), (5, 4))
+        cache.close()
+
+    def test_long_page_streams_with_cache(self):
+        paragraph = "a paragraph of words " * 50
+        lines = [line for i in range(4000) for line in (f"{paragraph}{i}\n", "\n")]
+        cache = BlockCache(self.path, 1)
+        for _ in range(2):
+            tracemalloc.start()
+            try:
+                for _ in iter_markdown_html(iter(lines), cache):
+                    pass
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            cache.flush()
+            # The page renders to about 4 MB of HTML.
+            self.assertLess(peak, 2 * 1024 * 1024)
+        self.assertEqual(cache.hits, 4000)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
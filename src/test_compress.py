@@ -0,0 +1,64 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import compress_outputs
+from manifest import BuildManifest
+
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.page = self.write("index.html", "<p>hello</p>" * 200)
+        self.tiny = self.write("tiny.css", "body {}")
+        self.image = self.write("logo.png", "x" * 4096)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_compresses_eligible_outputs(self):
+        manifest = BuildManifest(os.path.join(self.dir, "m.json"), "t", "/")
+        outputs = [self.page, self.tiny, self.image]
+        written = compress_outputs(outputs, outputs, manifest, jobs=2)
+        self.assertEqual(written, [self.page + ".gz"])
+        with gzip.open(self.page + ".gz", "rb") as f, open(self.page, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+        self.assertEqual(manifest.outputs(), {self.page + ".gz"})
+
+    def test_unchanged_outputs_are_skipped(self):
+        outputs = [self.page]
+        compress_outputs(outputs, outputs)
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        self.assertEqual(compress_outputs(outputs, []), [])
+
+        self.write("index.html", "<p>changed</p>" * 200)
+        self.assertEqual(compress_outputs(outputs, outputs), [self.page + ".gz"])
+        with open(self.page + ".gz", "rb") as f:
+            self.assertNotEqual(f.read(), first)
+
+    def test_output_is_reproducible(self):
+        compress_outputs([self.page], [self.page])
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        compress_outputs([self.page], [self.page])
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_min_size(self):
+        self.assertEqual(
+            compress_outputs([self.tiny], [self.tiny], min_size=1),
+            [self.tiny + ".gz"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
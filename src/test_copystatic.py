@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from copystatic import copy_file, copy_files_recursive, is_unchanged
+from manifest import BuildManifest
+from sourceindex import scan_tree
+
+
+class TestCopyStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "tom.png"), "png bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.static, rel_path), "w") as f:
+            f.write(text)
+
+    def sync(self, **kwargs):
+        manifest = BuildManifest(self.manifest_path, "t", "/")
+        manifest.load()
+        copied = copy_files_recursive(self.static, self.dest, manifest, **kwargs)
+        manifest.prune()
+        manifest.save()
+        return sorted(os.path.relpath(path, self.dest) for path in copied)
+
+    def test_copy_file_preserves_contents_and_mtime(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.tmp.name, "index.css")
+        copy_file(from_path, dest_path)
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "body {}")
+        entry = scan_tree(from_path)[0]
+        self.assertTrue(is_unchanged(from_path, entry, dest_path))
+
+    def test_second_sync_is_noop(self):
+        self.assertEqual(self.sync(), ["images/tom.png", "index.css"])
+        self.assertEqual(self.sync(), [])
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write("index.css", "body { color: red; }")
+        self.assertEqual(self.sync(), ["index.css"])
+
+    def test_checksum_skips_touched_file(self):
+        self.sync()
+        path = os.path.join(self.static, "index.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.sync(checksum=True), [])
+        self.assertEqual(self.sync(), [])
+
+    def test_removed_file_is_pruned(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "index.css"))
+        self.sync()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images", "tom.png")))
+
+    def test_link_does_not_write_through_to_source(self):
+        self.sync(link=True)
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.dest, "index.css")
+        self.assertTrue(os.path.samefile(source, dest))
+        self.write("index.css", "body { color: red; }")
+        self.sync()
+        with open(dest) as f:
+            self.assertEqual(f.read(), "body { color: red; }")
+
+
+if __name__ == "__main__":
+    unittest.main()
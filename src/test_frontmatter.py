@@ -0,0 +1,71 @@
+import io
+import unittest
+
+from frontmatter import format_value, is_published, parse_value, read_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_style(self):
+        f = io.StringIO(
+            "---\n"
+            'title: "Tom: a mistake"\n'
+            "date: 2024-03-01\n"
+            "# a comment\n"
+            "\n"
+            "draft: true\n"
+            "tags: [tolkien, 'essays']\n"
+            "order: 3\n"
+            "---\n"
+            "# Heading\n"
+        )
+        self.assertEqual(
+            read_front_matter(f),
+            {
+                "title": "Tom: a mistake",
+                "date": "2024-03-01",
+                "draft": True,
+                "tags": ["tolkien", "essays"],
+                "order": 3,
+            },
+        )
+        self.assertEqual(f.read(), "# Heading\n")
+
+    def test_toml_style(self):
+        f = io.StringIO('+++\ntitle = "Tom"\npublished = false\n+++\nbody\n')
+        self.assertEqual(read_front_matter(f), {"title": "Tom", "published": False})
+        self.assertEqual(f.read(), "body\n")
+
+    def test_non_ascii_digits_stay_strings(self):
+        self.assertEqual(parse_value("²"), "²")
+        self.assertEqual(parse_value("１２"), "１２")
+        self.assertEqual(parse_value("12"), 12)
+
+    def test_no_front_matter(self):
+        f = io.StringIO("# Heading\n\ntext\n")
+        self.assertEqual(read_front_matter(f), {})
+        self.assertEqual(f.read(), "# Heading\n\ntext\n")
+
+    def test_stops_at_closing_delimiter(self):
+        f = io.StringIO("---\na: 1\n---\n---\nb: 2\n---\n")
+        self.assertEqual(read_front_matter(f), {"a": 1})
+        self.assertEqual(f.read(), "---\nb: 2\n---\n")
+
+    def test_unclosed(self):
+        with self.assertRaises(ValueError):
+            read_front_matter(io.StringIO("---\ntitle: x\n# Heading\n"))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            read_front_matter(io.StringIO("+++\ntitle: x\n+++\n"))
+
+    def test_is_published(self):
+        self.assertTrue(is_published({}))
+        self.assertFalse(is_published({"draft": True}))
+        self.assertFalse(is_published({"published": False}))
+
+    def test_format_value(self):
+        self.assertEqual(format_value(["a", 1, True]), "a, 1, true")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
 import unittest
 
-from gencontent import extract_title
+from blockcache import BlockCache
+from gencontent import extract_title, find_pages, generate_pages_recursive
+from links import LinkIndex
+from manifest import BuildManifest
+from markdown_blocks import cache_version
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -46,5 +52,166 @@ no title
             pass
 
 
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for name in ["b", "a", "c/d", "c/e"]:
+            os.makedirs(os.path.join(self.content, name), exist_ok=True)
+            with open(os.path.join(self.content, name, "index.md"), "w") as f:
+                f.write(f"# {name}\n\n[home](/)\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_outputs(self, dest):
+        outputs = {}
+        for from_path, dest_path in find_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def test_find_pages_sorted(self):
+        pages = find_pages(self.content, "out")
+        self.assertEqual(
+            [os.path.relpath(str(dest), "out") for _, dest in pages],
+            ["a/index.html", "b/index.html", "c/d/index.html", "c/e/index.html"],
+        )
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/")
+        generate_pages_recursive(self.content, self.template, parallel, "/", jobs=2)
+        self.assertEqual(self.read_outputs(serial), self.read_outputs(parallel))
+        self.assertEqual(
+            self.read_outputs(serial)["c/d/index.html"],
+            '<title>c/d</title><div><h1>c/d</h1><p><a href="/">home</a></p></div>',
+        )
+
+    def test_parallel_reports_failures(self):
+        with open(os.path.join(self.content, "b", "index.md"), "w") as f:
+            f.write("no title here")
+        with self.assertRaises(RuntimeError):
+            generate_pages_recursive(
+                self.content,
+                self.template,
+                os.path.join(self.tmp.name, "out"),
+                "/",
+                jobs=2,
+            )
+
+    def test_links_collected_serial_and_parallel(self):
+        for jobs in (1, 2):
+            dest = os.path.join(self.tmp.name, f"out{jobs}")
+            links = LinkIndex()
+            generate_pages_recursive(
+                self.content, self.template, dest, "/base/", jobs=jobs, links=links
+            )
+            self.assertEqual(len(links.pages), 4)
+            page = os.path.normpath(os.path.join(dest, "c", "d", "index.html"))
+            self.assertEqual(links.pages[page], ["/"])
+
+    def test_front_matter_and_drafts(self):
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title><p>{{ author }}</p>{{ Content }}")
+        with open(os.path.join(self.content, "a", "index.md"), "w") as f:
+            f.write('---\ntitle: "A & B"\nauthor: Tolkien\n---\n# heading\n')
+        with open(os.path.join(self.content, "b", "index.md"), "w") as f:
+            f.write("---\ndraft: true\n---\n# b\n")
+        dest = os.path.join(self.tmp.name, "out")
+        generate_pages_recursive(self.content, self.template, dest, "/")
+        with open(os.path.join(dest, "a", "index.html")) as f:
+            self.assertEqual(
+                f.read(),
+                "<title>A &amp; B</title><p>Tolkien</p><div><h1>heading</h1></div>",
+            )
+        self.assertFalse(os.path.exists(os.path.join(dest, "b", "index.html")))
+
+        generate_pages_recursive(self.content, self.template, dest, "/", drafts=True)
+        self.assertTrue(os.path.exists(os.path.join(dest, "b", "index.html")))
+
+    def test_front_matter_values_are_attribute_safe(self):
+        with open(self.template, "w") as f:
+            f.write('<meta name="description" content="{{ description }}">')
+        with open(os.path.join(self.content, "a", "index.md"), "w") as f:
+            f.write("---\ndescription: He said \"hi\" onload=x\n---\n# a\n")
+        dest = os.path.join(self.tmp.name, "out")
+        generate_pages_recursive(self.content, self.template, dest, "/")
+        self.assertEqual(
+            self.read_outputs(dest)["a/index.html"],
+            '<meta name="description" content="He said &quot;hi&quot; onload=x">',
+        )
+
+    def test_incremental_rebuilds_only_template_dependents(self):
+        root = self.tmp.name
+        with open(os.path.join(root, "post.html"), "w") as f:
+            f.write("<article>{{> footer.html }}{{ Content }}</article>")
+        footer = os.path.join(root, "footer.html")
+        with open(footer, "w") as f:
+            f.write("<footer>v1</footer>")
+        with open(os.path.join(self.content, "c", "d", "index.md"), "w") as f:
+            f.write("---\ntemplate: post.html\n---\n# c/d\n")
+
+        dest = os.path.join(root, "out")
+        manifest_path = os.path.join(root, "manifest.json")
+
+        def build():
+            manifest = BuildManifest(manifest_path, "t", "/")
+            manifest.load()
+            changed = generate_pages_recursive(
+                self.content, self.template, dest, "/", manifest=manifest
+            )
+            manifest.save()
+            return [os.path.relpath(path, dest) for path in changed]
+
+        self.assertEqual(len(build()), 4)
+        self.assertEqual(build(), [])
+
+        with open(footer, "w") as f:
+            f.write("<footer>v2</footer>")
+        stat = os.stat(footer)
+        os.utime(footer, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(build(), [os.path.join("c", "d", "index.html")])
+        self.assertEqual(
+            self.read_outputs(dest)["c/d/index.html"],
+            "<article><footer>v2</footer><div><h1>c/d</h1></div></article>",
+        )
+
+        with open(self.template, "a") as f:
+            f.write("!")
+        self.assertEqual(
+            sorted(build()),
+            [
+                os.path.join("a", "index.html"),
+                os.path.join("b", "index.html"),
+                os.path.join("c", "e", "index.html"),
+            ],
+        )
+
+    def test_cache_does_not_outlive_fingerprinting(self):
+        with open(os.path.join(self.content, "a", "index.md"), "w") as f:
+            f.write("# a\n\n![tom](/images/tom.png)\n")
+        cache_path = os.path.join(self.tmp.name, "blocks.sqlite3")
+        dest = os.path.join(self.tmp.name, "out")
+        assets = {"/images/tom.png": "/images/tom.0123abcd.png"}
+        runs = ((True, assets["/images/tom.png"]), (False, "/images/tom.png"))
+        for fingerprint, src in runs:
+            cache = BlockCache(cache_path, cache_version("/", fingerprint))
+            generate_pages_recursive(
+                self.content,
+                self.template,
+                dest,
+                "/",
+                cache=cache,
+                assets=assets if fingerprint else None,
+            )
+            cache.close()
+            self.assertIn(f'src="{src}"', self.read_outputs(dest)["a/index.html"])
+
+
 if __name__ == "__main__":
     unittest.main()
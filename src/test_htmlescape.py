@@ -0,0 +1,28 @@
+import unittest
+
+from htmlescape import escape_attr, escape_text
+
+
+class TestEscape(unittest.TestCase):
+    def test_plain_text_is_returned_unchanged(self):
+        text = "nothing to see here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attr(text), text)
+
+    def test_escape_text(self):
+        self.assertEqual(
+            escape_text('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"'
+        )
+
+    def test_escape_attr(self):
+        self.assertEqual(
+            escape_attr('/search?q="x"&page=<2>'),
+            "/search?q=&quot;x&quot;&amp;page=&lt;2&gt;",
+        )
+
+    def test_existing_entities_are_escaped(self):
+        self.assertEqual(escape_text("&amp;"), "&amp;amp;")
+
+
+if __name__ == "__main__":
+    unittest.main()
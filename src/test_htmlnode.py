@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import LeafNode, ParentNode, HTMLNode
 
@@ -60,6 +61,10 @@ class TestHTMLNode(unittest.TestCase):
             '<a href="https://www.google.com">Click me!</a>',
         )
 
+    def test_leaf_to_html_non_string_props(self):
+        node = LeafNode("img", "", {"width": 100, "hidden": True})
+        self.assertEqual(node.to_html(), '<img width="100" hidden="True"></img>')
+
     def test_leaf_to_html_no_tag(self):
         node = LeafNode(None, "Hello, world!")
         self.assertEqual(node.to_html(), "Hello, world!")
@@ -108,6 +113,48 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_to_html_no_children(self):
+        node = ParentNode("div", None)
+        self.assertRaises(ValueError, node.to_html)
+
+    def test_iter_html_chunks(self):
+        node = ParentNode(
+            "ul",
+            [ParentNode("li", [LeafNode(None, "one")]), LeafNode("li", "two")],
+            {"class": "list"},
+        )
+        self.assertEqual(
+            list(node.iter_html()),
+            ['<ul class="list">', "<li>", "one", "</li>", "<li>two</li>", "</ul>"],
+        )
+
+    def test_write_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "bold")])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+
+    def test_to_html_deep_nesting(self):
+        node = LeafNode(None, "leaf")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), 5000 * len("<span></span>") + len("leaf"))
+
+    def test_nodes_are_slotted(self):
+        leaf = LeafNode("b", "bold")
+        parent = ParentNode("p", [leaf])
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertFalse(hasattr(parent, "__dict__"))
+        with self.assertRaises(AttributeError):
+            leaf.extra = True
+
+    def test_tags_are_interned(self):
+        tag = "".join(["h", "2"])
+        node = ParentNode(tag, [])
+        self.assertIs(node.tag, ParentNode("h2", []).tag)
+
 
 if __name__ == "__main__":
     unittest.main()
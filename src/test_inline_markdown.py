@@ -1,3 +1,4 @@
+import random
 import unittest
 from inline_markdown import (
     split_nodes_delimiter,
@@ -191,6 +192,63 @@ class TestInlineMarkdown(unittest.TestCase):
             nodes,
         )
 
+    def test_text_to_textnodes_unclosed(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **unclosed text")
+
+    def test_text_to_textnodes_literal_brackets(self):
+        nodes = text_to_textnodes("an ![unfinished image and [a](https://boot.dev)")
+        self.assertListEqual(
+            [
+                TextNode("an ![unfinished image and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "https://boot.dev"),
+            ],
+            nodes,
+        )
+
+
+def chained_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+class TestSinglePassCompatibility(unittest.TestCase):
+    pieces = [
+        "plain words ",
+        "**bold words**",
+        "_italic_",
+        "`code`",
+        "![alt text](/images/tom.png)",
+        "[a link](https://boot.dev)",
+        "[< Back Home](/)",
+        " and ",
+        "! ",
+        "[brackets] ",
+        "(parens) ",
+        "a * b ",
+        "****",
+        "__",
+    ]
+
+    def test_matches_chained_splitters(self):
+        rng = random.Random(1234)
+        for _ in range(2000):
+            text = "".join(rng.choice(self.pieces) for _ in range(rng.randint(1, 12)))
+            self.assertListEqual(
+                chained_text_to_textnodes(text), text_to_textnodes(text), text
+            )
+
+    def test_matches_chained_splitters_on_link_heavy_text(self):
+        text = " ".join(
+            f"[link {i}](/page/{i}) ![img {i}](/img/{i}.png)" for i in range(500)
+        )
+        self.assertListEqual(chained_text_to_textnodes(text), text_to_textnodes(text))
+
 
 if __name__ == "__main__":
     unittest.main()
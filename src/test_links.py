@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from links import LinkIndex
+
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.dest = "docs"
+        self.outputs = {
+            os.path.join("docs", "index.html"),
+            os.path.join("docs", "index.css"),
+            os.path.join("docs", "blog", "tom", "index.html"),
+            os.path.join("docs", "images", "tom.png"),
+        }
+
+    def check(self, targets):
+        links = LinkIndex()
+        links.add(os.path.join("docs", "blog", "tom", "index.html"), targets)
+        return [target for _, target in links.check(self.dest, self.outputs)]
+
+    def test_internal_targets(self):
+        self.assertEqual(
+            self.check(
+                ["/", "/blog/tom", "/blog/tom/", "/images/tom.png", "/index.css"]
+            ),
+            [],
+        )
+
+    def test_broken_targets(self):
+        self.assertEqual(
+            self.check(["/blog/bob", "/images/bob.png"]),
+            ["/blog/bob", "/images/bob.png"],
+        )
+
+    def test_fingerprinted_targets(self):
+        links = LinkIndex()
+        links.add(os.path.join("docs", "index.html"), ["/index.css", "/app.css"])
+        outputs = {os.path.join("docs", "index.0123abcd.css")}
+        assets = {"/index.css": "/index.0123abcd.css", "/app.css": "/app.1.css"}
+        self.assertEqual(
+            links.check(self.dest, outputs, assets),
+            [(os.path.join("docs", "index.html"), "/app.css")],
+        )
+
+    def test_relative_targets(self):
+        self.assertEqual(
+            self.check(["../../images/tom.png", "../contact"]), ["../contact"]
+        )
+
+    def test_external_and_fragment_targets_are_skipped(self):
+        self.assertEqual(
+            self.check(
+                ["https://boot.dev", "//cdn.example/x.js", "mailto:a@b.c", "#top"]
+            ),
+            [],
+        )
+
+    def test_query_and_fragment_are_ignored(self):
+        self.assertEqual(
+            self.check(["/blog/tom?x=1#intro", "/blog%20x"]), ["/blog%20x"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.path = os.path.join(self.dir, "manifest.json")
+        self.output = os.path.join(self.dir, "index.html")
+        with open(self.output, "w") as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.output), hash_file(self.output))
+        self.assertEqual(len(hash_file(self.output)), 64)
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.load()
+        self.assertTrue(manifest.is_current("pages", self.output, "abc"))
+        self.assertFalse(manifest.is_current("pages", self.output, "def"))
+
+    def test_template_change_is_left_to_page_digests(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.record("pages", self.output, "abc")
+        manifest.record("static", self.output, "abc")
+        manifest.record("depends", self.output, ["template.html"])
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t2", "/")
+        manifest.load()
+        self.assertTrue(manifest.is_current("pages", self.output, "abc"))
+        self.assertTrue(manifest.is_current("static", self.output, "abc"))
+        self.assertEqual(
+            manifest.previous_value("depends", self.output), ["template.html"]
+        )
+        self.assertEqual(manifest.outputs(), set())
+
+    def test_other_output_dir_is_ignored(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.output = "other"
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.output = self.dir
+        manifest.load()
+        self.assertFalse(manifest.is_current("pages", self.output, "abc"))
+        self.assertEqual(manifest.prune(), [])
+        self.assertTrue(os.path.exists(self.output))
+
+    def test_basepath_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t1", "/blog/")
+        manifest.load()
+        self.assertFalse(manifest.is_current("pages", self.output, "abc"))
+
+    def test_missing_output_is_not_current(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+        os.remove(self.output)
+
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.load()
+        self.assertFalse(manifest.is_current("pages", self.output, "abc"))
+
+    def test_prune(self):
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.load()
+        removed = manifest.prune()
+        self.assertEqual(removed, [os.path.normpath(self.output)])
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_prune_only_removes_recorded_outputs(self):
+        page = os.path.join(self.dir, "old", "index.html")
+        os.mkdir(os.path.dirname(page))
+        unrelated = os.path.join(self.dir, "notes.txt")
+        for path in (page, unrelated):
+            with open(path, "w") as f:
+                f.write("old")
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.output = self.dir
+        manifest.record("pages", page, "abc")
+        manifest.record("pages", self.output, "abc")
+        manifest.save()
+
+        manifest = BuildManifest(self.path, "t1", "/")
+        manifest.output = self.dir
+        manifest.load(reuse=False)
+        self.assertFalse(manifest.is_current("pages", self.output, "abc"))
+        manifest.record("pages", self.output, "abc")
+        self.assertEqual(manifest.prune(), [os.path.normpath(page)])
+        self.assertFalse(os.path.exists(os.path.dirname(page)))
+        self.assertTrue(os.path.exists(unrelated))
+        self.assertTrue(os.path.exists(self.output))
+
+if __name__ == "__main__":
+    unittest.main()
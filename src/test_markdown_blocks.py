@@ -1,8 +1,13 @@
+import io
+import random
 import unittest
 from markdown_blocks import (
+    iter_blocks,
+    iter_markdown_html,
     markdown_to_html_node,
     markdown_to_blocks,
     block_to_block_type,
+    classify_block,
     BlockType,
 )
 
@@ -163,6 +168,99 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_lines(self):
+        md = """
+intro
+
+```
+first
+
+second
+```
+
+outro
+"""
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["intro", "```\nfirst\n\nsecond\n```", "outro"],
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>intro</p><pre><code>first\n\nsecond\n</code></pre>"
+            "<p>outro</p></div>",
+        )
+
+    def test_inline_triple_backticks_do_not_open_a_fence(self):
+        md = "```ls``` lists files\n\n# Heading\n\n- a"
+        self.assertEqual(
+            markdown_to_blocks(md), ["```ls``` lists files", "# Heading", "- a"]
+        )
+        self.assertEqual(
+            markdown_to_blocks("```python\nx\n\ny\n```"), ["```python\nx\n\ny\n```"]
+        )
+
+    def test_unclosed_fence_splits_like_text(self):
+        md = "```\ncode\n\n# Heading\n\n- a\n"
+        self.assertEqual(markdown_to_blocks(md), ["```\ncode", "# Heading", "- a"])
+
+    def test_iter_blocks_matches_split(self):
+        rng = random.Random(42)
+        pieces = ["# title", "text", "- item", "  indented", "", "", " ", "> quote"]
+        for _ in range(1000):
+            md = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            md = md.rstrip("\n") + "\n"
+            if md == "\n":
+                continue
+            expected = [block.strip() for block in md.split("\n\n") if block != ""]
+            self.assertEqual(list(iter_blocks(io.StringIO(md))), expected, repr(md))
+
+    def test_iter_markdown_html(self):
+        md = """
+# heading
+
+- a **list**
+- with items
+
+```
+code
+```
+"""
+        self.assertEqual(
+            "".join(iter_markdown_html(io.StringIO(md))),
+            markdown_to_html_node(md).to_html(),
+        )
+
+    def test_trailing_blank_lines(self):
+        self.assertEqual(markdown_to_blocks("text\n\n\n"), ["text"])
+
+    def test_classify_block_strips_prefixes(self):
+        self.assertEqual(
+            classify_block("> quote\n>   more quote"),
+            (BlockType.QUOTE, ["quote", "more quote"]),
+        )
+        self.assertEqual(
+            classify_block("- list\n- items"), (BlockType.ULIST, ["list", "items"])
+        )
+        self.assertEqual(
+            classify_block("1. list\n2. items"), (BlockType.OLIST, ["list", "items"])
+        )
+        self.assertEqual(
+            classify_block("- list\nnot a list"),
+            (BlockType.PARAGRAPH, ["- list", "not a list"]),
+        )
+
+    def test_classify_ordered_list_numbering(self):
+        self.assertEqual(block_to_block_type("1. a\n3. b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. a\n02. b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. a\n2.b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. a\n². b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. a\n２. b"), BlockType.PARAGRAPH)
+
+    def test_long_ordered_list(self):
+        md = "\n".join(f"{i}. item" for i in range(1, 12))
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><ol>" + "<li>item</li>" * 11 + "</ol></div>")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from output import check_output_dir, write_changed_files, write_if_changed
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_writes_new_file(self):
+        self.assertTrue(write_if_changed(self.path, ["<p>", "Váya", "</p>"]))
+        self.assertEqual(self.read(), "<p>Váya</p>")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_skips_identical_content(self):
+        write_if_changed(self.path, ["<p>hi</p>"])
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, 1_000_000_000))
+        self.assertFalse(write_if_changed(self.path, ["<p>", "hi", "</p>"]))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_rewrites_changed_content(self):
+        write_if_changed(self.path, ["<p>hi</p>"])
+        self.assertTrue(write_if_changed(self.path, ["<p>ho</p>"]))
+        self.assertEqual(self.read(), "<p>ho</p>")
+
+    def test_failed_render_keeps_old_file(self):
+        write_if_changed(self.path, ["<p>hi</p>"])
+
+        def chunks():
+            yield "<p>"
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            write_if_changed(self.path, chunks())
+        self.assertEqual(self.read(), "<p>hi</p>")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_write_changed_files(self):
+        list_path = os.path.join(self.tmp.name, "changed.txt")
+        root = os.path.join(self.tmp.name, "docs")
+        write_changed_files(
+            list_path,
+            [os.path.join(root, "index.html")],
+            [os.path.join(root, "old", "index.html")],
+            root,
+        )
+        with open(list_path) as f:
+            self.assertEqual(f.read(), "M\tindex.html\nD\told/index.html\n")
+
+    def test_check_output_dir(self):
+        content = os.path.join(self.tmp.name, "content")
+        check_output_dir(os.path.join(self.tmp.name, "docs"), [content])
+        for dest in (self.tmp.name, content, os.getcwd(), "."):
+            with self.assertRaises(ValueError):
+                check_output_dir(dest, [content])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+import profiling
+from gencontent import find_pages, generate_pages_recursive
+from pipeline import PagePipeline
+
+
+class TestPagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/x.css">{{ Content }}')
+        for i in range(10):
+            os.makedirs(os.path.join(self.content, f"p{i}"))
+            with open(os.path.join(self.content, f"p{i}", "index.md"), "w") as f:
+                f.write(f"# page {i}\n\n- [link](/p{i})\n- _item_\n")
+
+    def tearDown(self):
+        profiling.active = None
+        self.tmp.cleanup()
+
+    def read_outputs(self, dest):
+        outputs = {}
+        for _, dest_path in find_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def build(self, name, pipeline=None):
+        dest = os.path.join(self.tmp.name, name)
+        changed = generate_pages_recursive(
+            self.content, self.template, dest, "/base/", pipeline=pipeline
+        )
+        return dest, changed
+
+    def test_matches_serial_build(self):
+        serial, _ = self.build("serial")
+        for depth in [1, 3, 32]:
+            pipelined, changed = self.build(
+                f"pipelined{depth}", PagePipeline(2, 2, depth)
+            )
+            self.assertEqual(len(changed), 10)
+            self.assertEqual(self.read_outputs(serial), self.read_outputs(pipelined))
+
+    def test_unchanged_pages_are_not_reported(self):
+        self.build("out", PagePipeline())
+        _, changed = self.build("out", PagePipeline())
+        self.assertEqual(changed, [])
+
+    def test_failures_are_reported(self):
+        with open(os.path.join(self.content, "p3", "index.md"), "w") as f:
+            f.write("no title")
+        with self.assertRaises(RuntimeError):
+            self.build("out", PagePipeline(2, 2, 2))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.tmp.name, "out", "p9", "index.html"))
+        )
+
+    def test_profiles_pages(self):
+        profiling.active = profiling.Profiler()
+        self.build("out", PagePipeline())
+        self.assertEqual(len(profiling.active.pages), 10)
+        self.assertIn("read", profiling.active.pages[0]["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiling
+from markdown_blocks import markdown_to_html_node
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = profiling.Profiler()
+        profiling.active = self.profiler
+
+    def tearDown(self):
+        profiling.active = None
+
+    def test_stage_inactive(self):
+        profiling.active = None
+        with profiling.stage("read") as stage:
+            stage.nbytes = 10
+        self.assertEqual(self.profiler.pages, [])
+
+    def test_nested_stages_record_self_time(self):
+        self.profiler.begin_page("page.md")
+        markdown_to_html_node("# title\n\n- a **list**\n- item")
+        page = self.profiler.end_page()
+        self.assertEqual(
+            set(page["stages"]),
+            {"block split", "node build", "block typing", "inline parse"},
+        )
+        self.assertEqual(page["stages"]["inline parse"][1], len("titlea **list**item"))
+        stage_seconds = sum(seconds for seconds, _ in page["stages"].values())
+        self.assertLessEqual(stage_seconds, page["seconds"])
+        self.assertEqual(
+            [event[0] for event in page["events"]], ["block split", "node build"]
+        )
+        self.assertEqual(page["events"][1][3], 2)
+
+    def test_iter_stage(self):
+        self.profiler.begin_page("page.md")
+        chunks = ["<p>", "hi", "</p>"]
+        chunks = list(profiling.iter_stage("serialize", iter(chunks)))
+        page = self.profiler.end_page()
+        self.assertEqual(chunks, ["<p>", "hi", "</p>"])
+        self.assertEqual(page["stages"]["serialize"][1], 9)
+        self.assertEqual(page["events"][0][3], 4)
+
+    def test_summary_and_trace(self):
+        for path in ["a.md", "b.md"]:
+            self.profiler.begin_page(path)
+            with profiling.stage("read", 5):
+                pass
+            self.profiler.end_page()
+        summary = self.profiler.summary(top=1)
+        self.assertIn("Profiled 2 page(s):", summary)
+        self.assertIn("Slowest 1 page(s):", summary)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            self.profiler.write_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(
+            [(event["cat"], event["name"]) for event in events],
+            [("page", "a.md"), ("stage", "read"), ("page", "b.md"), ("stage", "read")],
+        )
+        self.assertEqual(events[0]["ts"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import shutil
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from shards import (
+    SHARD_MANIFEST_NAME,
+    in_shard,
+    merge_shards,
+    parse_shard,
+    shard_of,
+)
+
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ["0/4", "5/4", "2", "a/b", "-1/4"]:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+    def test_shards_partition_paths(self):
+        paths = [f"section-{i % 7}/page-{i}/index.md" for i in range(200)]
+        slices = [
+            [path for path in paths if in_shard(path, (index, 4))]
+            for index in range(1, 5)
+        ]
+        self.assertEqual(sorted(path for s in slices for path in s), sorted(paths))
+        self.assertTrue(all(slices))
+
+    def test_shard_is_stable(self):
+        path = "blog/tom/index.md"
+        self.assertEqual(shard_of(path, 8), shard_of(path, 8))
+        self.assertEqual(shard_of(path, 1), 1)
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_shard(self, index, count, files, basepath="/"):
+        output = os.path.join(self.root, "shards", f"{index}-of-{count}")
+        manifest = BuildManifest(
+            os.path.join(output, SHARD_MANIFEST_NAME), "template", basepath
+        )
+        manifest.shard = (index, count)
+        manifest.output = output
+        for rel_path, text in files.items():
+            path = os.path.join(output, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+            manifest.record("pages", path, "digest")
+        os.makedirs(output, exist_ok=True)
+        manifest.save()
+        return output
+
+    def test_merge(self):
+        os.makedirs(self.dest)
+        unrelated = os.path.join(self.dest, "notes.txt")
+        with open(unrelated, "w") as f:
+            f.write("not ours")
+        shards = [
+            self.make_shard(1, 2, {"index.html": "home", "blog/a.html": "a"}),
+            self.make_shard(2, 2, {"blog/b.html": "b"}),
+        ]
+        copied, removed = merge_shards(shards, self.dest, self.manifest_path)
+        self.assertEqual(len(copied), 3)
+        self.assertEqual(removed, [])
+        with open(os.path.join(self.dest, "blog", "b.html")) as f:
+            self.assertEqual(f.read(), "b")
+
+        manifest = BuildManifest(self.manifest_path, "template", "/")
+        manifest.output = os.path.normpath(self.dest)
+        manifest.load()
+        self.assertTrue(
+            manifest.is_current(
+                "pages", os.path.join(self.dest, "blog", "a.html"), "digest"
+            )
+        )
+        self.assertEqual(merge_shards(shards, self.dest, self.manifest_path), ([], []))
+
+        shutil.rmtree(shards[0])
+        shards[0] = self.make_shard(1, 2, {"index.html": "home"})
+        copied, removed = merge_shards(shards, self.dest, self.manifest_path)
+        self.assertEqual(removed, [os.path.join(self.dest, "blog", "a.html")])
+        self.assertTrue(os.path.exists(unrelated))
+
+    def test_refuses_dest_containing_shards(self):
+        shards = [self.make_shard(1, 1, {"index.html": "home"})]
+        with self.assertRaises(ValueError):
+            merge_shards(shards, self.root, self.manifest_path)
+
+    def test_conflicting_outputs(self):
+        shards = [
+            self.make_shard(1, 2, {"index.html": "one"}),
+            self.make_shard(2, 2, {"index.html": "two"}),
+        ]
+        with self.assertRaises(RuntimeError):
+            merge_shards(shards, self.dest, self.manifest_path)
+        self.assertFalse(os.path.exists(self.dest))
+
+    def test_identical_outputs_are_not_conflicts(self):
+        shards = [
+            self.make_shard(1, 2, {"index.html": "same"}),
+            self.make_shard(2, 2, {"index.html": "same"}),
+        ]
+        copied, _ = merge_shards(shards, self.dest, self.manifest_path)
+        self.assertEqual(copied, [os.path.join(self.dest, "index.html")])
+
+    def test_missing_shard(self):
+        shards = [self.make_shard(1, 3, {"a.html": "a"})]
+        with self.assertRaises(ValueError):
+            merge_shards(shards, self.dest, self.manifest_path)
+
+    def test_mismatched_basepath(self):
+        shards = [
+            self.make_shard(1, 2, {"a.html": "a"}),
+            self.make_shard(2, 2, {"b.html": "b"}, basepath="/base/"),
+        ]
+        with self.assertRaises(ValueError):
+            merge_shards(shards, self.dest, self.manifest_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
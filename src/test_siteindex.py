@@ -0,0 +1,160 @@
+import io
+import os
+import tempfile
+import unittest
+
+from siteindex import build_site_index, extract_title_from_lines, page_url
+from urls import UrlResolver
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.pages = []
+        for rel_path, title in [
+            ("index.md", "Home"),
+            ("blog/b/index.md", "B & co"),
+            ("blog/a/index.md", "A"),
+            ("blog/c.md", "C"),
+        ]:
+            from_path = os.path.join(self.content, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(from_path), exist_ok=True)
+            with open(from_path, "w") as f:
+                f.write(f"intro\n# {title}\n\nbody\n")
+            dest_path = os.path.join(self.dest, *rel_path.split("/"))
+            self.pages.append((from_path, dest_path[: -len(".md")] + ".html"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(
+            page_url(os.path.join("docs", "blog", "a", "index.html"), "docs"),
+            "/blog/a",
+        )
+        self.assertEqual(
+            page_url(os.path.join("docs", "blog", "c.html"), "docs"), "/blog/c.html"
+        )
+
+    def test_extract_title_stops_at_title(self):
+        lines = io.StringIO("# Title\n" + "not read\n" * 10)
+        self.assertEqual(extract_title_from_lines(lines), "Title")
+        self.assertEqual(lines.readline(), "not read\n")
+
+    def test_posts_and_nav(self):
+        site = build_site_index(self.pages, self.dest)
+        self.assertEqual(
+            [meta.url for meta in site.posts], ["/blog/a", "/blog/b", "/blog/c.html"]
+        )
+        middle = site.get(os.path.join(self.dest, "blog", "b", "index.html"))
+        self.assertEqual(middle.title, "B & co")
+        self.assertEqual(middle.prev, ("/blog/a", "A"))
+        self.assertEqual(middle.next, ("/blog/c.html", "C"))
+        self.assertEqual(
+            site.get(os.path.join(self.dest, "blog", "c.html")).nav_html(
+                UrlResolver("/base/")
+            ),
+            '<nav><a href="/base/blog/b" rel="prev">B &amp; co</a></nav>',
+        )
+        self.assertIsNone(site.get(os.path.join(self.dest, "index.html")).prev)
+
+    def test_page_digest_tracks_neighbours(self):
+        site = build_site_index(self.pages, self.dest)
+        home = os.path.join(self.dest, "index.html")
+        post = os.path.join(self.dest, "blog", "b", "index.html")
+        self.assertEqual(site.page_digest(home, "abc"), "abc")
+        digest = site.page_digest(post, "abc")
+        self.assertNotEqual(digest, "abc")
+
+        shorter = build_site_index(self.pages[:3], self.dest)
+        self.assertNotEqual(shorter.page_digest(post, "abc"), digest)
+
+    def test_update_rereads_only_changed_pages(self):
+        site = build_site_index(self.pages, self.dest)
+        a_from, a_dest = self.pages[2]
+        c_dest = self.pages[3][1]
+        b_dest = os.path.normpath(self.pages[1][1])
+        with open(a_from, "w") as f:
+            f.write("# A2\n")
+        nav_changed = site.update([(a_from, a_dest)], [c_dest])
+        self.assertEqual(nav_changed, {b_dest})
+        self.assertEqual([meta.url for meta in site.posts], ["/blog/a", "/blog/b"])
+        self.assertEqual(site.get(b_dest).prev, ("/blog/a", "A2"))
+        self.assertIsNone(site.get(b_dest).next)
+        self.assertIsNone(site.get(c_dest))
+
+        rebuilt = build_site_index(self.pages[:3], self.dest)
+        self.assertEqual(
+            [(m.url, m.prev, m.next) for m in site.posts],
+            [(m.url, m.prev, m.next) for m in rebuilt.posts],
+        )
+
+    def test_generated_pages(self):
+        site = build_site_index(self.pages, self.dest)
+        pages = {
+            os.path.relpath(dest_path, self.dest): ("".join(chunks), targets)
+            for dest_path, chunks, targets in site.generated_pages(
+                self.template, "/", "https://example.com/"
+            )
+        }
+        listing, targets = pages[os.path.join("blog", "index.html")]
+        self.assertEqual(
+            listing,
+            "<title>Blog</title><div><h1>Blog</h1><ul>"
+            '<li><a href="/blog/a">A</a></li>'
+            '<li><a href="/blog/b">B &amp; co</a></li>'
+            '<li><a href="/blog/c.html">C</a></li></ul></div>',
+        )
+        self.assertEqual(targets, ["/blog/a", "/blog/b", "/blog/c.html"])
+        feed, _ = pages[os.path.join("blog", "feed.xml")]
+        self.assertIn("<link>https://example.com/blog</link>", feed)
+        self.assertLess(
+            feed.index("https://example.com/blog/c.html"),
+            feed.index("https://example.com/blog/a"),
+        )
+        self.assertIn("<title>B &amp; co</title>", feed)
+
+    def test_front_matter(self):
+        dated = [
+            ("blog/a/index.md", "---\ndate: 2024-05-01\n---\n# A\n"),
+            ("blog/b/index.md", "+++\ntitle = \"Bee\"\ndate = 2023-01-01\n+++\n"),
+            ("blog/d/index.md", "---\ndraft: true\n---\n# D\n"),
+        ]
+        pages = []
+        for rel_path, text in dated:
+            from_path = os.path.join(self.content, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(from_path), exist_ok=True)
+            with open(from_path, "w") as f:
+                f.write(text)
+            dest_path = os.path.join(self.dest, *rel_path.split("/"))
+            pages.append((from_path, dest_path[: -len(".md")] + ".html"))
+
+        site = build_site_index(pages, self.dest)
+        self.assertEqual([meta.title for meta in site.posts], ["Bee", "A"])
+        feed = site.render_feed("/")
+        self.assertIn("<pubDate>Wed, 01 May 2024 00:00:00 +0000</pubDate>", feed)
+
+        with_drafts = build_site_index(pages, self.dest, drafts=True)
+        # Undated posts sort before dated ones.
+        self.assertEqual(
+            [meta.title for meta in with_drafts.posts], ["D", "Bee", "A"]
+        )
+
+    def test_existing_listing_page_is_kept(self):
+        listing = os.path.join(self.content, "blog", "index.md")
+        with open(listing, "w") as f:
+            f.write("# My blog\n")
+        pages = self.pages + [(listing, os.path.join(self.dest, "blog", "index.html"))]
+        site = build_site_index(pages, self.dest)
+        generated = [path for path, _, _ in site.generated_pages(self.template, "/")]
+        self.assertEqual(generated, [os.path.join(self.dest, "blog", "feed.xml")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from sourceindex import scan_tree
+
+
+class TestScanTree(unittest.TestCase):
+    def test_sorted_flat_index(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel_path in ["blog.md", "blog/b.md", "blog/a/index.md", "a.md"]:
+                path = os.path.join(root, *rel_path.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(rel_path)
+            os.mkdir(os.path.join(root, "empty"))
+
+            entries = scan_tree(root)
+            self.assertEqual(
+                [entry.rel_path for entry in entries],
+                ["a.md", "blog/a/index.md", "blog/b.md", "blog.md"],
+            )
+            entry = entries[1]
+            self.assertEqual(entry.path, os.path.join(root, "blog", "a", "index.md"))
+            self.assertEqual(entry.size, len("blog/a/index.md"))
+            self.assertEqual(entry.mtime_ns, os.stat(entry.path).st_mtime_ns)
+
+    def test_single_file(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("x")
+            entries = scan_tree(path)
+            self.assertEqual([(e.rel_path, e.path) for e in entries], [("template.html", path)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+
+from template import (
+    compile_template,
+    load_template,
+    resolve_template_path,
+    rewrite_basepath,
+)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments(self):
+        template = compile_template("<title>{{ Title }}</title>{{Content}}!")
+        self.assertEqual(
+            template.segments,
+            [
+                (False, "<title>"),
+                (True, "Title"),
+                (False, "</title>"),
+                (True, "Content"),
+                (False, "!"),
+            ],
+        )
+        self.assertEqual(template.placeholders(), ["Title", "Content"])
+
+    def test_render(self):
+        template = compile_template("{{ Title }} on {{ Date }}: {{ Description }}")
+        self.assertEqual(
+            template.render({"Title": "Tom", "Date": "2024-01-01"}),
+            "Tom on 2024-01-01: ",
+        )
+
+    def test_render_iterable_value(self):
+        template = compile_template("<div>{{ Content }}</div>")
+        self.assertEqual(
+            list(template.iter_render({"Content": iter(["<p>", "hi", "</p>"])})),
+            ["<div>", "<p>", "hi", "</p>", "</div>"],
+        )
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(
+            rewrite_basepath('<a href="/x"><img src="/y.png">', "/base/"),
+            '<a href="/base/x"><img src="/base/y.png">',
+        )
+
+    def test_rewrite_basepath_skips_protocol_relative(self):
+        self.assertEqual(
+            rewrite_basepath('<script src="//cdn.example/x.js"></script>', "/base/"),
+            '<script src="//cdn.example/x.js"></script>',
+        )
+
+    def test_rewrite_basepath_uses_assets(self):
+        assets = {"/index.css": "/index.0123abcd.css"}
+        self.assertEqual(
+            rewrite_basepath('<link href="/index.css"><a href="/x">', "/base/", assets),
+            '<link href="/base/index.0123abcd.css"><a href="/base/x">',
+        )
+
+    def test_load_template_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write('<link href="/index.css">{{ Content }}')
+            template = load_template(path, "/base/")
+            self.assertIs(load_template(path, "/base/"), template)
+            self.assertEqual(
+                template.render({"Content": "x"}),
+                '<link href="/base/index.css">x',
+            )
+
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(
+                load_template(path, "/base/").render({"Content": "x"}),
+                "<main>x</main>",
+            )
+
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "post.html")
+            header = os.path.join(tmp, "partials", "header.html")
+            logo = os.path.join(tmp, "partials", "logo.html")
+            os.makedirs(os.path.dirname(header))
+            with open(path, "w") as f:
+                f.write("{{> partials/header.html }}{{ Content }}")
+            with open(header, "w") as f:
+                f.write("<header>{{>logo.html}}{{ Title }}</header>")
+            with open(logo, "w") as f:
+                f.write('<img src="/logo.png">')
+            template = load_template(path, "/base/")
+            self.assertEqual(
+                template.render({"Title": "T", "Content": "x"}),
+                '<header><img src="/base/logo.png">T</header>x',
+            )
+            self.assertEqual(template.dependencies, (path, header, logo))
+
+            with open(logo, "w") as f:
+                f.write("LOGO")
+            stat = os.stat(logo)
+            os.utime(logo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(
+                load_template(path, "/base/").render({"Title": "T"}),
+                "<header>LOGOT</header>",
+            )
+
+    def test_partial_cycle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            a = os.path.join(tmp, "a.html")
+            b = os.path.join(tmp, "b.html")
+            with open(a, "w") as f:
+                f.write("{{> b.html }}")
+            with open(b, "w") as f:
+                f.write("{{> a.html }}")
+            with self.assertRaises(ValueError):
+                load_template(a, "/")
+
+    def test_resolve_template_path(self):
+        path = os.path.join("site", "template.html")
+        self.assertEqual(resolve_template_path(path, None), path)
+        self.assertEqual(
+            resolve_template_path(path, "post.html"), os.path.join("site", "post.html")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
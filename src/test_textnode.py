@@ -54,6 +54,17 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
 
+    def test_text_is_escaped(self):
+        node = TextNode("< Back & forth", TextType.LINK, "/?a=1&b=2")
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(
+            html_node.to_html(), '<a href="/?a=1&amp;b=2">&lt; Back &amp; forth</a>'
+        )
+
+    def test_slotted(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
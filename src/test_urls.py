@@ -0,0 +1,42 @@
+import unittest
+
+from markdown_blocks import markdown_to_html_node
+from urls import UrlResolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_resolve(self):
+        resolver = UrlResolver("/base/")
+        self.assertEqual(resolver.resolve("/blog/tom"), "/base/blog/tom")
+        self.assertEqual(resolver.resolve("/"), "/base/")
+        self.assertEqual(resolver.resolve("https://boot.dev"), "https://boot.dev")
+        self.assertEqual(resolver.resolve("//cdn.example/x.png"), "//cdn.example/x.png")
+        self.assertEqual(resolver.resolve("images/x.png"), "images/x.png")
+
+    def test_root_basepath_is_identity(self):
+        self.assertEqual(UrlResolver().resolve("/blog/tom"), "/blog/tom")
+
+    def test_assets_are_looked_up_before_basepath(self):
+        resolver = UrlResolver("/base/", {"/index.css": "/index.0123abcd.css"})
+        self.assertEqual(resolver.resolve("/index.css"), "/base/index.0123abcd.css")
+        self.assertEqual(resolver.resolve("/blog"), "/base/blog")
+        self.assertEqual(resolver.links, ["/index.css", "/blog"])
+
+    def test_links_resolved_while_building_nodes(self):
+        md = """[home](/) and ![tom](/images/tom.png)
+
+```
+<a href="/not-a-link">
+```
+"""
+        node = markdown_to_html_node(md, resolver=UrlResolver("/base/"))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/base/">home</a> and '
+            '<img src="/base/images/tom.png" alt="tom"></img></p>'
+            '<pre><code>&lt;a href="/not-a-link"&gt;\n</code></pre></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import tempfile
+import unittest
+
+from watch import SiteWatcher, diff_snapshots
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    existed = os.path.exists(path)
+    with open(path, "w") as f:
+        f.write(text)
+    if existed:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.dest = os.path.join(root, "docs")
+        write(self.template, "{{ Content }}")
+        write(os.path.join(self.content, "index.md"), "# home")
+        write(os.path.join(self.content, "blog", "index.md"), "# blog")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        self.watcher = SiteWatcher(
+            self.content, self.static, self.template, self.dest, "/"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts)) as f:
+            return f.read()
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1)}
+        new = {"a": (2, 1), "c": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["a", "c"], ["b"]))
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), ([], [], [], []))
+
+    def test_page_change_rebuilds_only_that_page(self):
+        write(os.path.join(self.content, "blog", "index.md"), "# blog v2")
+        changes = self.watcher.poll()
+        self.assertEqual(changes[0], [os.path.join(self.content, "blog", "index.md")])
+        self.watcher.rebuild(*changes)
+        self.assertEqual(
+            self.read("blog", "index.html"), "<div><h1>blog v2</h1></div>"
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_page_change_reads_only_that_page(self):
+        # Edit the home page behind the watcher's back, keeping its size and
+        # mtime; a rebuild that re-read every page would pick up the title.
+        home = os.path.join(self.content, "index.md")
+        stat = os.stat(home)
+        with open(home, "w") as f:
+            f.write("# HOME")
+        os.utime(home, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        write(os.path.join(self.content, "blog", "index.md"), "# blog v2")
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(
+            self.read("blog", "index.html"), "<div><h1>blog v2</h1></div>"
+        )
+        home_dest = os.path.join(self.dest, "index.html")
+        self.assertEqual(self.watcher.site.get(home_dest).title, "home")
+
+    def test_template_change_rebuilds_every_page(self):
+        write(self.template, "<main>{{ Content }}</main>")
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(
+            self.read("index.html"), "<main><div><h1>home</h1></div></main>"
+        )
+        self.assertEqual(
+            self.read("blog", "index.html"), "<main><div><h1>blog</h1></div></main>"
+        )
+
+    def test_failing_page_does_not_stop_the_batch(self):
+        write(self.template, "<main>{{ Content }}</main>")
+        write(os.path.join(self.content, "a.md"), "no title")
+        with self.assertRaises(RuntimeError):
+            self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(
+            self.read("index.html"), "<main><div><h1>home</h1></div></main>"
+        )
+        self.assertEqual(
+            self.read("blog", "index.html"), "<main><div><h1>blog</h1></div></main>"
+        )
+
+    def test_new_post_updates_neighbour_nav_and_feed(self):
+        write(self.template, "{{ Content }}{{ Nav }}")
+        write(os.path.join(self.content, "blog", "a.md"), "# a")
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(self.read("blog", "a.html"), "<div><h1>a</h1></div>")
+
+        write(os.path.join(self.content, "blog", "b.md"), "# b")
+        changes = self.watcher.poll()
+        self.assertEqual(changes[0], [os.path.join(self.content, "blog", "b.md")])
+        self.watcher.rebuild(*changes)
+        self.assertEqual(
+            self.read("blog", "a.html"),
+            '<div><h1>a</h1></div><nav><a href="/blog/b.html" rel="next">b</a></nav>',
+        )
+        self.assertIn("<title>b</title>", self.read("blog", "feed.xml"))
+
+    def test_partial_change_rebuilds_only_dependents(self):
+        root = self.tmp.name
+        write(os.path.join(root, "post.html"), "{{> nav.html }}{{ Content }}")
+        write(os.path.join(root, "nav.html"), "<nav>v1</nav>")
+        write(
+            os.path.join(self.content, "blog", "index.md"),
+            "---\ntemplate: post.html\n---\n# blog\n",
+        )
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(
+            self.read("blog", "index.html"), "<nav>v1</nav><div><h1>blog</h1></div>"
+        )
+
+        write(os.path.join(root, "nav.html"), "<nav>v2</nav>")
+        changes = self.watcher.poll()
+        self.assertEqual(changes[0], [os.path.join(self.content, "blog", "index.md")])
+        self.watcher.rebuild(*changes)
+        self.assertEqual(
+            self.read("blog", "index.html"), "<nav>v2</nav><div><h1>blog</h1></div>"
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_static_change_and_removal(self):
+        write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertEqual(self.read("index.css"), "body { color: red; }")
+        self.assertEqual(
+            os.stat(os.path.join(self.dest, "index.css")).st_mtime_ns,
+            os.stat(os.path.join(self.static, "index.css")).st_mtime_ns,
+        )
+
+        os.remove(os.path.join(self.static, "index.css"))
+        self.watcher.rebuild(*self.watcher.poll())
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+from htmlescape import escape_text
 from htmlnode import LeafNode
 from enum import Enum
 
@@ -12,6 +13,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -28,17 +31,19 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolver=None):
     if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
+        return LeafNode(None, escape_text(text_node.text))
     if text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
+        return LeafNode("b", escape_text(text_node.text))
     if text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
+        return LeafNode("i", escape_text(text_node.text))
     if text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
+        return LeafNode("code", escape_text(text_node.text))
     if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+        return LeafNode("a", escape_text(text_node.text), {"href": url})
     if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+        return LeafNode("img", "", {"src": url, "alt": text_node.text})
     raise ValueError(f"invalid text type: {text_node.text_type}")
@@ -0,0 +1,17 @@
+class UrlResolver:
+    __slots__ = ("basepath", "links", "assets")
+
+    def __init__(self, basepath="/", assets=None):
+        self.basepath = basepath
+        self.links = []
+        self.assets = assets if assets is not None else {}
+
+    def resolve(self, url):
+        self.links.append(url)
+        url = self.assets.get(url, url)
+        if self.basepath == "/" or not url.startswith("/") or url.startswith("//"):
+            return url
+        return self.basepath + url[1:]
+
+    def __repr__(self):
+        return f"UrlResolver({self.basepath})"
@@ -0,0 +1,168 @@
+import os
+import time
+from pathlib import Path
+
+from copystatic import copy_file
+from gencontent import find_pages, generate_page, generate_site_pages
+from siteindex import build_site_index
+from sourceindex import scan_tree
+
+
+def snapshot(path):
+    return {entry.path: entry.signature() for entry in scan_tree(path)}
+
+
+def diff_snapshots(old, new):
+    changed = sorted(path for path in new if old.get(path) != new[path])
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+class SiteWatcher:
+    def __init__(
+        self,
+        content_dir,
+        static_dir,
+        template_path,
+        dest_dir,
+        basepath,
+        interval=0.25,
+        cache=None,
+        site_url="",
+        drafts=False,
+    ):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.interval = interval
+        self.cache = cache
+        self.site_url = site_url
+        self.drafts = drafts
+        self.site = self.build_site()
+        self.graph = self.site.dependency_graph(template_path, basepath)
+        self.content = snapshot(content_dir)
+        self.static = snapshot(static_dir)
+        self.templates = self.snapshot_templates()
+
+    def build_site(self):
+        return build_site_index(
+            find_pages(self.content_dir, self.dest_dir), self.dest_dir, self.drafts
+        )
+
+    def snapshot_templates(self):
+        paths = {self.template_path}
+        for dependencies in self.graph.values():
+            paths.update(dependencies)
+        files = {}
+        for path in paths:
+            if os.path.isfile(path):
+                files.update(snapshot(path))
+        return files
+
+    def page_dest_path(self, from_path):
+        rel_path = os.path.relpath(from_path, self.content_dir)
+        return Path(os.path.join(self.dest_dir, rel_path)).with_suffix(".html")
+
+    def static_dest_path(self, from_path):
+        return os.path.join(self.dest_dir, os.path.relpath(from_path, self.static_dir))
+
+    def poll(self):
+        content = snapshot(self.content_dir)
+        static = snapshot(self.static_dir)
+        templates = self.snapshot_templates()
+
+        static_changed, static_removed = diff_snapshots(self.static, static)
+        templates_changed, templates_removed = diff_snapshots(self.templates, templates)
+        pages_changed, pages_removed = diff_snapshots(self.content, content)
+        changed = set(templates_changed) | set(templates_removed)
+        if changed:
+            dependents = {
+                self.site.pages[dest_path].from_path
+                for dest_path, dependencies in self.graph.items()
+                if changed.intersection(dependencies)
+            }
+            pages_changed = sorted(dependents.union(pages_changed))
+
+        self.content = content
+        self.static = static
+        self.templates = templates
+        return pages_changed, pages_removed, static_changed, static_removed
+
+    def rebuild(self, pages_changed, pages_removed, static_changed, static_removed):
+        for from_path in static_changed:
+            dest_path = self.static_dest_path(from_path)
+            print(f" * {from_path} -> {dest_path}")
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            copy_file(from_path, dest_path)
+        # Only the changed pages are re-read; the rest of the index is kept.
+        site = self.site
+        pages = [
+            (from_path, self.page_dest_path(from_path))
+            for from_path in pages_changed
+            if os.path.isfile(from_path)
+        ]
+        removed_pages = [self.page_dest_path(path) for path in pages_removed]
+        nav_changed = site.update(pages, removed_pages, self.drafts)
+        pages_changed = set(pages_changed)
+        pages_changed.update(site.pages[dest].from_path for dest in nav_changed)
+        changed_dests = [dest_path for _, dest_path in pages]
+        for dest_path in changed_dests + removed_pages:
+            self.graph.pop(os.path.normpath(dest_path), None)
+        self.graph.update(
+            site.dependency_graph(self.template_path, self.basepath, changed_dests)
+        )
+        self.templates = self.snapshot_templates()
+        # One broken page must not leave the rest of the batch stale, since
+        # poll() has already moved its snapshots past these changes.
+        failures = []
+        for from_path in sorted(pages_changed):
+            dest_path = self.page_dest_path(from_path)
+            if site.get(dest_path) is None:
+                if os.path.isfile(dest_path):
+                    print(f" * removed {dest_path}")
+                    os.remove(dest_path)
+                continue
+            print(f" * {from_path} {self.template_path} -> {dest_path}")
+            try:
+                generate_page(
+                    from_path,
+                    self.template_path,
+                    dest_path,
+                    self.basepath,
+                    self.cache,
+                    meta=site.get(dest_path),
+                )
+            except Exception as e:
+                print(f" ! {from_path}: {e}")
+                failures.append(from_path)
+        if pages_changed or pages_removed:
+            generate_site_pages(
+                site, self.template_path, self.basepath, site_url=self.site_url
+            )
+        removed = [self.static_dest_path(path) for path in static_removed]
+        removed += removed_pages
+        for dest_path in removed:
+            if os.path.isfile(dest_path):
+                print(f" * removed {dest_path}")
+                os.remove(dest_path)
+        if failures:
+            raise RuntimeError(f"{len(failures)} page(s) failed to build")
+
+    def run(self):
+        sources = f"{self.content_dir}, {self.static_dir}, {self.template_path}"
+        print(f"Watching {sources}...")
+        while True:
+            time.sleep(self.interval)
+            changes = self.poll()
+            if not any(changes):
+                continue
+            start = time.perf_counter()
+            try:
+                self.rebuild(*changes)
+            except Exception as e:
+                print(f" ! rebuild failed: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt in {elapsed_ms:.1f}ms")